@@ -16,12 +16,16 @@ def get_api_key(model):
     env_var_name = list(MODELS_USED[model])[0]  
     return st.session_state.get(env_var_name) or os.getenv(env_var_name)
 
-def get_supabase_client():
-    """Returns a Supabase client if credentials exist, otherwise shows a guide."""
+def get_supabase_credentials():
+    """Returns (url, anon key) if Supabase is configured, otherwise None."""
     supabase_url = st.session_state.get('SUPABASE_URL') or os.getenv('SUPABASE_URL')
     supabase_key = st.session_state.get('SUPABASE_ANON_KEY') or os.getenv('SUPABASE_ANON_KEY')
 
     if not supabase_url or not supabase_key or "your-supabase-url-here" in supabase_url:
         return None
+    return supabase_url, supabase_key
 
-    return create_client(supabase_url, supabase_key)
+def get_supabase_client():
+    """Returns a Supabase client if credentials exist, otherwise None."""
+    credentials = get_supabase_credentials()
+    return create_client(*credentials) if credentials else None
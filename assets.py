@@ -21,6 +21,9 @@ TIMEOUT_SETTINGS = {
 
 NUMBER_SCROLL = 2
 
+# Local on-disk state (HTTP cache, frontier, archives, ...)
+CACHE_DIR = ".scraper_cache"
+
 GENERIC_SYSTEM_MESSAGE = """
 You are an intelligent text extraction and conversion assistant. Your task is to extract structured information 
 from the given text and convert it into a pure JSON format. The JSON should contain only the structured data extracted from the text, 
@@ -0,0 +1,247 @@
+# benchmarks.py
+#
+# Micro-benchmarks for the scraping pipeline.
+#   python benchmarks.py browser_pool [--n 10]
+#   python benchmarks.py sample_url_labels --out fixtures/url_labels.csv [--n 10]   (live crawl)
+#   python benchmarks.py url_classifier [--source fixtures/url_labels.csv]
+
+import argparse
+import time
+
+BENCHMARKS = {}
+
+
+def benchmark(fn):
+    BENCHMARKS[fn.__name__.replace("bench_", "")] = fn
+    return fn
+
+
+def _timed(label, fn, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    total = time.perf_counter() - t0
+    print(f"  {label:<28} total {total:7.2f}s   per call {total / n * 1000:8.1f} ms")
+    return total
+
+
+@benchmark
+def bench_browser_pool(n: int = 10):
+    """Per-URL Chromium launch (old behaviour) vs. pages from the warm pool."""
+    from playwright.sync_api import sync_playwright
+    from browser_pool import pooled_page, shutdown
+
+    html = "data:text/html,<a href='/2025/01/01/robot-news'>x</a>"
+
+    def cold():
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            page = browser.new_page()
+            page.goto(html)
+            page.content()
+            browser.close()
+
+    def warm():
+        with pooled_page() as page:
+            page.goto(html)
+            page.content()
+
+    print(f"[bench] browser_pool, {n} page loads")
+    cold_t = _timed("launch per URL", cold, n)
+    warm()  # first call pays the one-off launch
+    warm_t = _timed("shared browser pool", warm, n)
+    shutdown()
+    print(f"  startup cost removed: {(cold_t - warm_t) / n * 1000:.1f} ms per page ({cold_t / max(warm_t, 1e-9):.1f}x)")
+
+
+def _load_html(source: str) -> str:
+    """HTML from a URL (fetched once) or a local file."""
+    if source.startswith(("http://", "https://")):
+        from http_client import http_get
+        return http_get(source).text
+    with open(source, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+@benchmark
+def bench_links(n: int = 50, source: str = "https://www.therobotreport.com/category/news/"):
+    """BeautifulSoup(html.parser) + find_all('a') loop vs. link_extractor.extract_links."""
+    import re
+    from urllib.parse import urljoin
+    from bs4 import BeautifulSoup
+    import link_extractor
+
+    html = _load_html(source)
+    print(f"[bench] links, {len(html) / 1024:.0f} KiB from {source}, {n} iterations "
+          f"(parser: {'lxml' if link_extractor._lxml_html else 'html.parser tokenizer'})")
+
+    def old():
+        soup = BeautifulSoup(html, "html.parser")
+        links = [urljoin(source, a["href"]) for a in soup.find_all("a", href=True)]
+        found = [h for h in links if re.search(r"(20\d{2}|article|news|robot)", h, re.I)]
+        next(
+            (a for a in soup.find_all("a", href=True) if "next" in a.get_text(strip=True).lower()),
+            None,
+        )
+        return found
+
+    def new():
+        return link_extractor.extract_links(html, source)
+
+    print(f"  links found: old={len(set(old()))} new={len(new().links)}")
+    old_t = _timed("bs4 html.parser", old, n)
+    new_t = _timed("link_extractor", new, n)
+    print(f"  speedup: {old_t / max(new_t, 1e-9):.1f}x")
+
+
+def _count_tokens(text: str) -> int:
+    try:
+        import tiktoken
+        return len(tiktoken.encoding_for_model("gpt-4o").encode(text))
+    except Exception:
+        return len(text) // 4   # rough fallback when tiktoken is unavailable
+
+
+@benchmark
+def bench_extraction(n: int = 1, source: str = "https://www.therobotreport.com/category/news/"):
+    """
+    Token reduction per site from content_extraction. source is a listing page URL
+    (up to 5 of its articles are sampled per site) or a comma-separated list of
+    article URLs / HTML files.
+    """
+    from urllib.parse import urlparse
+    from collections import defaultdict
+    from content_extraction import extract_main_content
+    from link_extractor import DATED_PERMALINK_RE, extract_links
+
+    sources = source.split(",")
+    if len(sources) == 1 and sources[0].startswith("http"):
+        sources = extract_links(_load_html(sources[0]), sources[0], pattern=DATED_PERMALINK_RE).links[:5] or sources
+
+    per_site = defaultdict(lambda: [0, 0, 0, 0.0])
+    for src in sources:
+        html = _load_html(src)
+        t0 = time.perf_counter()
+        for _ in range(n):
+            doc = extract_main_content(html, src)
+        elapsed = (time.perf_counter() - t0) / n
+        site = urlparse(src).netloc or src
+        stats = per_site[site]
+        stats[0] += 1
+        stats[1] += _count_tokens(html)
+        stats[2] += _count_tokens(doc["markdown"])
+        stats[3] += elapsed
+
+    print(f"[bench] extraction, {len(sources)} pages")
+    for site, (pages, before, after, secs) in per_site.items():
+        print(f"  {site:<32} pages {pages:3d}  tokens/page {before // pages:6d} -> {after // pages:6d}"
+              f"  ({100 * (1 - after / max(before, 1)):.0f}% fewer)  {secs / pages * 1000:.1f} ms/page")
+
+
+@benchmark
+def bench_url_classifier(n: int = 1, source: str = "fixtures/url_labels.csv"):
+    """
+    Precision/recall of the old discovery regex vs. url_classifier on a labelled CSV
+    (url,anchor_text,label) sampled from a crawl with sample_url_labels and reviewed
+    by hand. fixtures/url_labels_smoke.csv is a hand-written regression set written
+    alongside the heuristics: its scores are not a measure of accuracy.
+    """
+    import csv
+    import os
+    from link_extractor import ARTICLE_HREF_RE
+    from url_classifier import UrlClassifier
+
+    if not os.path.exists(source):
+        print(f"[bench] {source} not found; sample one with: python benchmarks.py sample_url_labels --out {source}")
+        return
+    with open(source, encoding="utf-8") as f:
+        rows = [(r["url"], r["anchor_text"], r["label"] == "1") for r in csv.DictReader(f)]
+    classifier = UrlClassifier(path="")   # no learned templates: heuristics only, reproducible
+
+    def report(label, predict):
+        tp = fp = fn = 0
+        misses = []
+        for url, text, truth in rows:
+            guess = predict(url, text)
+            tp += guess and truth
+            fp += guess and not truth
+            fn += truth and not guess
+            if guess != truth:
+                misses.append(("FP" if guess else "FN", url))
+        precision, recall = tp / max(tp + fp, 1), tp / max(tp + fn, 1)
+        print(f"  {label:<28} precision {precision:5.2f}   recall {recall:5.2f}   ({fp} FP, {fn} FN)")
+        return misses
+
+    print(f"[bench] url_classifier, {len(rows)} labelled URLs from {source}")
+    report("discovery regex", lambda url, text: bool(ARTICLE_HREF_RE.search(url)))
+    report("classifier (URL only)", lambda url, text: classifier.is_article(url))
+    misses = report("classifier (URL + anchor)", lambda url, text: classifier.is_article(url, text))
+    for kind, url in misses:
+        print(f"    {kind} {url}")
+    _timed("classify all", lambda: [classifier.score(url, text) for url, text, _ in rows], max(n, 100))
+
+
+@benchmark
+def bench_sample_url_labels(n: int = 10, out: str = None):
+    """
+    Write a labelled CSV for bench_url_classifier from a live crawl: n same-site
+    links sampled from each configured site's front page, labelled 1 when the
+    fetched page yields an article body (the signal crawl.py feeds to learn()).
+    Review the labels by hand before committing the file. out is required and an
+    existing file is never overwritten.
+    """
+    import csv
+    import os
+    import random
+    from urllib.parse import urljoin, urlparse
+    from content_extraction import MIN_CONTENT_CHARS, extract_main_content
+    from http_client import fetch_many
+    from link_extractor import _iter_anchors
+    from scraping_strategies import SCRAPING_STRATEGIES
+
+    if not out:
+        raise SystemExit("sample_url_labels needs --out <path>")
+    if os.path.exists(out):
+        raise SystemExit(f"{out} already exists; pass a new path")
+
+    rng = random.Random(0)
+    sampled = {}                      # url -> anchor text
+    for domain in SCRAPING_STRATEGIES:
+        home = f"https://{domain}/"
+        try:
+            html = _load_html(home)
+        except Exception as e:
+            print(f"  skipping {domain}: {e}")
+            continue
+        anchors = {}
+        for href, _, text in _iter_anchors(html):
+            url = urljoin(home, href.strip()).split("#")[0]
+            if urlparse(url).netloc.lower().replace("www.", "") == domain and url not in anchors:
+                anchors[url] = text
+        for url in rng.sample(sorted(anchors), min(n, len(anchors))):
+            sampled[url] = anchors[url]
+
+    pages = fetch_many(sampled)
+    with open(out, "x", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["url", "anchor_text", "label"])
+        for url, text in sampled.items():
+            html = pages.get(url, "")
+            is_article = bool(html) and len(extract_main_content(html, url)["text"]) >= MIN_CONTENT_CHARS
+            writer.writerow([url, text, int(is_article)])
+    print(f"[bench] sampled {len(sampled)} labelled URLs from {len(SCRAPING_STRATEGIES)} sites into {out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scraper micro-benchmarks")
+    parser.add_argument("name", choices=sorted(BENCHMARKS))
+    parser.add_argument("--n", type=int, default=10)
+    parser.add_argument("--source", help="URL or HTML file, for benchmarks that parse a page")
+    parser.add_argument("--out", help="output file, for benchmarks that write one")
+    args = parser.parse_args()
+    kwargs = {"n": args.n}
+    if args.source:
+        kwargs["source"] = args.source
+    if args.out:
+        kwargs["out"] = args.out
+    BENCHMARKS[args.name](**kwargs)
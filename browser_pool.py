@@ -0,0 +1,166 @@
+# browser_pool.py
+#
+# Keeps a few warm Chromium instances alive and hands out isolated pages
+# (one fresh BrowserContext per page), instead of launching a browser per URL.
+#
+# The sync Playwright API is bound to the thread that started it, so each thread
+# gets its own pool, and a pool can only be closed on that thread. Callers close
+# their thread's pool with close_thread_pool() (or browser_session()) when their
+# crawl ends - Streamlit runs every script run on a new thread, so a pool left
+# open would keep its Chromium processes for the life of the server.
+
+import atexit
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import List, Optional
+
+from playwright.sync_api import sync_playwright
+from resource_blocking import install_blocking
+
+POOL_SIZE             = 1     # warm browsers per thread
+MAX_PAGES_PER_BROWSER = 50    # recycle a browser after this many pages
+LAUNCH_ARGS           = {"headless": True}
+
+
+class _PooledBrowser:
+    def __init__(self, playwright):
+        self.browser = playwright.chromium.launch(**LAUNCH_ARGS)
+        self.pages_served = 0
+
+    def healthy(self) -> bool:
+        try:
+            return self.browser.is_connected()
+        except Exception:
+            return False
+
+    def close(self):
+        try:
+            self.browser.close()
+        except Exception:
+            pass
+
+
+class BrowserPool:
+    """Per-thread pool of warm Chromium browsers."""
+
+    def __init__(self, size: int = POOL_SIZE, max_pages: int = MAX_PAGES_PER_BROWSER):
+        self.size = size
+        self.max_pages = max_pages
+        self._playwright = None
+        self._browsers: List[Optional[_PooledBrowser]] = []
+        self._cycle = None
+        self._owner = threading.get_ident()
+
+    def _start(self):
+        self._playwright = sync_playwright().start()
+        self._browsers = [None] * self.size
+        self._cycle = itertools.cycle(range(self.size))
+        with _pools_lock:
+            _live_pools.add(self)
+
+    def _acquire(self) -> _PooledBrowser:
+        if self._playwright is None:
+            self._start()
+        slot = next(self._cycle)
+        pooled = self._browsers[slot]
+
+        # Health check + recycling
+        if pooled is not None and (not pooled.healthy() or pooled.pages_served >= self.max_pages):
+            reason = "unhealthy" if not pooled.healthy() else f"served {pooled.pages_served} pages"
+            print(f"[BrowserPool] Recycling browser {slot} ({reason})")
+            pooled.close()
+            pooled = None
+
+        if pooled is None:
+            pooled = _PooledBrowser(self._playwright)
+            self._browsers[slot] = pooled
+        return pooled
+
+    @contextmanager
+    def page(self, site_url: Optional[str] = None, block_resources: bool = True, **context_kwargs):
+        """
+        Yield a page in a fresh, isolated browser context. When site_url is given
+        and block_resources is on, the site's resource-blocking policy is applied.
+        """
+        pooled = self._acquire()
+        context = pooled.browser.new_context(**context_kwargs)
+        if site_url and block_resources:
+            install_blocking(context, site_url)
+        pooled.pages_served += 1
+        try:
+            yield context.new_page()
+        finally:
+            try:
+                context.close()
+            except Exception:
+                pass
+
+    def close(self):
+        with _pools_lock:
+            _live_pools.discard(self)
+        for pooled in self._browsers:
+            if pooled is not None:
+                pooled.close()
+        self._browsers = []
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+
+_local = threading.local()
+_live_pools = set()
+_pools_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    pool = getattr(_local, "pool", None)
+    if pool is None:
+        pool = BrowserPool()
+        _local.pool = pool
+    return pool
+
+
+def close_thread_pool():
+    """Close the calling thread's pool (its browsers and Playwright driver), if it has one."""
+    pool = getattr(_local, "pool", None)
+    if pool is not None:
+        _local.pool = None
+        pool.close()
+
+
+@contextmanager
+def browser_session():
+    """`with browser_session(): ...` closes this thread's pool when the block ends."""
+    try:
+        yield get_browser_pool()
+    finally:
+        close_thread_pool()
+
+
+@contextmanager
+def pooled_page(site_url: Optional[str] = None, block_resources: bool = True, **context_kwargs):
+    """Shortcut: `with pooled_page(url) as page: ...`"""
+    with get_browser_pool().page(site_url, block_resources, **context_kwargs) as page:
+        yield page
+
+
+def shutdown():
+    """
+    Close the started pools owned by the calling thread (at exit: the main thread).
+    Pools of other threads cannot be closed from here and are only reported.
+    """
+    me = threading.get_ident()
+    with _pools_lock:
+        pools = list(_live_pools)
+    for pool in pools:
+        if pool._owner == me:
+            pool.close()
+        else:
+            print("[BrowserPool] A pool opened on another thread was never closed with close_thread_pool()")
+
+
+atexit.register(shutdown)
@@ -0,0 +1,252 @@
+# content_extraction.py
+#
+# Readability-style main-content extraction, run between fetch and storage so
+# the LLM sees the article body instead of <head>, inline scripts and navigation.
+# Stdlib-only: one HTMLParser pass records text blocks with their element
+# ancestry, then the container holding the most paragraph text wins.
+
+import json
+import re
+from collections import defaultdict
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+MIN_CONTENT_CHARS = 200     # below this the extraction is treated as failed
+MIN_PARAGRAPH_CHARS = 25
+MAX_LINK_DENSITY = 0.5
+
+# Form controls only: ASP.NET WebForms pages wrap the whole body in <form id="aspnetForm">
+SKIP_TAGS  = {"script", "style", "noscript", "svg", "template", "iframe", "button", "select", "textarea", "nav", "aside", "footer"}
+VOID_TAGS  = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+BLOCK_TAGS = {"p", "h1", "h2", "h3", "h4", "h5", "h6", "li", "blockquote", "pre", "td", "dd", "figcaption"}
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+CONTAINER_TAGS = {"div", "section", "article", "main", "ul", "ol", "table", "figure", "header"}
+
+UNLIKELY_RE = re.compile(
+    r"comment|sidebar|footer|nav|menu|share|social|related|promo|advert|\bad-|newsletter|"
+    r"subscribe|cookie|popup|modal|breadcrumb|masthead|widget|sponsor|disqus|pagination",
+    re.I,
+)
+LIKELY_RE   = re.compile(r"article|content|post|entry|story|body|main|text", re.I)
+BYLINE_RE   = re.compile(r"byline|author", re.I)
+DATE_KEYS   = ("article:published_time", "og:published_time", "datepublished", "date", "pubdate",
+               "publish-date", "dc.date", "sailthru.date", "parsely-pub-date")
+
+
+class _Node:
+    __slots__ = ("id", "tag", "parent", "weight", "byline")
+
+    def __init__(self, node_id, tag, parent, weight, byline=False):
+        self.id = node_id
+        self.tag = tag
+        self.parent = parent
+        self.weight = weight
+        self.byline = byline
+
+
+class _ContentParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: List[_Node] = []
+        self.blocks = []          # [node, tag, text parts, link chars]
+        self.meta: Dict[str, str] = {}
+        self.title_parts: List[str] = []
+        self.bylines: List[str] = []
+        self.times: List[str] = []
+        self.json_ld: List[str] = []
+        self._skip_depth = 0
+        self._in_title = False
+        self._in_ld = False
+        self._byline_depth = 0
+        self._link_depth = 0
+        self._block = None
+        self._next_id = 0
+
+    # ── element bookkeeping ────────────────────────────────────────────────
+    def handle_starttag(self, tag, attrs):
+        attrs = {k: (v or "") for k, v in attrs}
+        if tag == "meta":
+            key = (attrs.get("property") or attrs.get("name") or attrs.get("itemprop") or "").lower()
+            if key and attrs.get("content"):
+                self.meta.setdefault(key, attrs["content"].strip())
+            return
+        if tag == "title":
+            self._in_title = True
+        if tag == "script" and "ld+json" in attrs.get("type", ""):
+            self._in_ld = True
+            self.json_ld.append("")
+            return
+        if tag == "time" and attrs.get("datetime"):
+            self.times.append(attrs["datetime"])
+        if tag in VOID_TAGS:
+            if tag == "br" and self._block is not None:
+                self._block[2].append("\n")
+            return
+
+        ident = f"{attrs.get('class', '')} {attrs.get('id', '')} {attrs.get('role', '')}"
+        if self._skip_depth or tag in SKIP_TAGS or (tag not in ("html", "body", "article", "main") and UNLIKELY_RE.search(ident) and not LIKELY_RE.search(ident)):
+            self._skip_depth += 1
+            self.stack.append(_Node(-1, tag, None, 0))
+            return
+
+        # <p> and <li> are often left unclosed: a new block / list item closes them
+        if self.stack and ((self.stack[-1].tag == "p" and tag in BLOCK_TAGS | CONTAINER_TAGS)
+                           or (self.stack[-1].tag == "li" and tag == "li")):
+            self._pop_to(self.stack[-1].tag)
+
+        weight = 0
+        if tag in ("article", "main"):
+            weight += 25
+        if LIKELY_RE.search(ident):
+            weight += 25
+        byline = bool(BYLINE_RE.search(ident) or attrs.get("rel") == "author")
+        if byline:
+            if not self._byline_depth:
+                self.bylines.append("")
+            self._byline_depth += 1
+        if tag == "a":
+            self._link_depth += 1
+
+        parent = self.stack[-1] if self.stack else None
+        node = _Node(self._next_id, tag, parent, weight, byline)
+        self._next_id += 1
+        self.stack.append(node)
+
+        if tag in BLOCK_TAGS and self._block is None:
+            self._block = [node, tag, [], 0]
+
+    def _pop_to(self, tag):
+        while self.stack:
+            node = self.stack.pop()
+            self._close(node)
+            if node.tag == tag:
+                break
+
+    def _close(self, node):
+        if node.id == -1:
+            self._skip_depth -= 1
+            return
+        if node.tag == "a":
+            self._link_depth -= 1
+        if node.byline:
+            self._byline_depth -= 1
+        if self._block is not None and self._block[0] is node:
+            self.blocks.append(self._block)
+            self._block = None
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        if tag == "script" and self._in_ld:
+            self._in_ld = False
+            return
+        if any(n.tag == tag for n in self.stack):
+            self._pop_to(tag)
+
+    def handle_data(self, data):
+        if self._in_ld:
+            self.json_ld[-1] += data
+            return
+        if self._in_title:
+            self.title_parts.append(data)
+            return
+        if self._skip_depth:
+            return
+        if self._byline_depth:
+            self.bylines[-1] += data
+        if self._block is not None:
+            self._block[2].append(data)
+            if self._link_depth:
+                self._block[3] += len(data.strip())
+
+
+def _clean(text: str) -> str:
+    text = re.sub(r"[ \t\r\f\v]+", " ", text)
+    return re.sub(r" *\n *", "\n", text).strip()
+
+
+def _json_ld_field(blobs: List[str], *keys) -> Optional[str]:
+    for blob in blobs:
+        try:
+            data = json.loads(blob)
+        except ValueError:
+            continue
+        items = data if isinstance(data, list) else data.get("@graph", [data]) if isinstance(data, dict) else []
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            for key in keys:
+                value = item.get(key)
+                if isinstance(value, dict):
+                    value = value.get("name")
+                if isinstance(value, list) and value:
+                    value = value[0].get("name") if isinstance(value[0], dict) else value[0]
+                if isinstance(value, str) and value.strip():
+                    return value.strip()
+    return None
+
+
+def extract_main_content(html: str, url: str = "") -> Dict[str, str]:
+    """
+    Return {"title", "byline", "date", "text", "markdown"} for the page's main
+    content. "text" is empty when nothing article-like was found.
+    """
+    parser = _ContentParser()
+    try:
+        parser.feed(html or "")
+        parser.close()
+    except Exception as e:  # malformed markup: keep whatever was parsed
+        print(f"[extract_main_content] parse error for {url}: {e}")
+    while parser.stack:
+        parser._close(parser.stack.pop())
+
+    meta = parser.meta
+    title = meta.get("og:title") or _json_ld_field(parser.json_ld, "headline") or _clean(" ".join(parser.title_parts))
+    byline = meta.get("author") or meta.get("article:author") or _json_ld_field(parser.json_ld, "author") \
+        or next((re.sub(r"^by\s+", "", _clean(b), flags=re.I) for b in parser.bylines if _clean(b)), "")
+    date = next((meta[k] for k in DATE_KEYS if meta.get(k)), None) \
+        or _json_ld_field(parser.json_ld, "datePublished", "dateCreated") \
+        or (parser.times[0] if parser.times else "")
+
+    # Score containers: paragraph text counts fully for the parent, half for the grandparent
+    scores = defaultdict(float)
+    for node, tag, parts, link_chars in parser.blocks:
+        text = _clean("".join(parts))
+        if tag == "p" and len(text) >= MIN_PARAGRAPH_CHARS and link_chars / max(len(text), 1) < MAX_LINK_DENSITY:
+            score = 1 + text.count(",") + min(len(text) // 100, 3)
+            parent = node.parent
+            if parent is not None:
+                scores[parent.id] += score + parent.weight / 25
+                if parent.parent is not None:
+                    scores[parent.parent.id] += (score + parent.parent.weight / 25) / 2
+
+    if not scores:
+        return {"title": title, "byline": byline, "date": date, "text": "", "markdown": ""}
+    best = max(scores, key=scores.get)
+
+    def inside(node):
+        while node is not None:
+            if node.id == best:
+                return True
+            node = node.parent
+        return False
+
+    lines = []
+    for node, tag, parts, link_chars in parser.blocks:
+        text = _clean("".join(parts))
+        if not text or not inside(node) or link_chars / len(text) >= MAX_LINK_DENSITY:
+            continue
+        if tag in HEADING_TAGS:
+            lines.append("#" * int(tag[1]) + " " + text)
+        elif tag == "li":
+            lines.append("- " + text)
+        elif tag == "blockquote":
+            lines.append("> " + text)
+        else:
+            lines.append(text)
+
+    body = "\n\n".join(dict.fromkeys(lines))
+    header = [f"# {title}" if title else "", f"By: {byline}" if byline else "",
+              f"Date: {date}" if date else "", f"URL: {url}" if url else ""]
+    markdown = "\n".join(h for h in header if h) + "\n\n" + body
+    return {"title": title, "byline": byline, "date": date, "text": body, "markdown": markdown.strip()}
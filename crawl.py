@@ -1,14 +1,45 @@
-import uuid, requests, re
-from urllib.parse import urlparse
-from api_management import get_supabase_client
-from markdown_io import save_raw_data
-from utils_fetch import fetch_html_playwright
+import run_stats
+from markdown_io import flush_writes, raw_data_row, save_raw_data_many
+from browser_pool import browser_session
 from generic_pagination import scrape_all_article_links
+from http_client import fetch_many, is_unchanged
+from frontier import get_frontier, unique_name_for
+from content_extraction import MIN_CONTENT_CHARS, extract_main_content
+from page_archive import get_archive
+from url_classifier import get_url_classifier
+from host_health import get_host_health
 
 def _unique_name(url: str) -> str:
-    parsed = urlparse(url)
-    slug   = re.sub(r'[^A-Za-z0-9_]+', '_', (parsed.netloc + parsed.path))[:100]
-    return f"{uuid.uuid4().hex[:8]}_{slug}"
+    return unique_name_for(url)
+
+def _extracted_row(uid: str, url: str, raw_html: str):
+    """
+    Row storing the clean article text for the LLM, with the HTML alongside it,
+    and whether an article body was found.
+    """
+    article = extract_main_content(raw_html, url) if raw_html else {"text": ""}
+    if len(article["text"]) >= MIN_CONTENT_CHARS:
+        run_stats.incr("extraction", "extracted")
+        return raw_data_row(uid, url=url, raw_data=article["markdown"], raw_html=raw_html), True
+    run_stats.incr("extraction", "fallback_raw_html")
+    return raw_data_row(uid, url=url, raw_data=raw_html, raw_html=raw_html), False
+
+def reextract_from_archive():
+    """
+    Re-run content extraction over every page in the local archive and re-store
+    raw_data, without touching the network. Returns the unique_names written.
+    """
+    run_stats.reset()
+    unique_names, rows = [], []
+    for url, raw_html in get_archive().iter_pages():
+        uid = _unique_name(url)
+        rows.append(_extracted_row(uid, url, raw_html)[0])
+        unique_names.append(uid)
+    save_raw_data_many(rows)
+    flush_writes()
+    print(f"[CRAWL] Re-extracted {len(unique_names)} archived pages")
+    run_stats.report()
+    return unique_names
 
 def crawl_and_extract(
     base_urls,
@@ -16,38 +47,75 @@ def crawl_and_extract(
     user_hint="",
     abm_context="",
     max_pages=3,
-    use_scroll=False,            # no longer used
-    use_browser_fetch=False,     # no longer used
+    use_scroll=False,            # no longer used: strategy comes from strategy_profile
+    use_browser_fetch=False,     # no longer used: strategy comes from strategy_profile
+    skip_unchanged=True,         # skip listings that answer 304 and were fully crawled last time
+    skip_processed=True,         # skip articles already extracted in earlier runs
 ):
     unique_names = []
     all_article_urls = []
+    crawled_bases = []            # listing pages that yielded article links
+    unscraped_bases = []          # listing pages that failed; processed as-is
+    frontier = get_frontier()
+    run_stats.reset()
 
-    for base_url in base_urls:
-        try:
-            print(f"[DEBUG] Crawling {base_url} with generic_pagination...")
-            urls = scrape_all_article_links(base_url, max_pages=max_pages)
-            print(f"[CRAWL] {len(urls)} articles found from {base_url}")
-            all_article_urls.extend(urls)
-        except Exception as e:
-            print(f"[⚠️] Could not scrape {base_url}: {e}")
-            all_article_urls.append(base_url)
+    # Playwright pools are bound to this thread; close ours when the listing crawl ends
+    with browser_session():
+        for base_url in base_urls:
+            # Only a listing whose last crawl finished at this depth can be skipped; the
+            # conditional GET is not worth making otherwise
+            if skip_unchanged and frontier.listing_crawl_complete(base_url, max_pages) and is_unchanged(base_url):
+                print(f"[CRAWL] {base_url} unchanged since its last complete crawl (304), skipping.")
+                continue
+            try:
+                print(f"[DEBUG] Crawling {base_url} with generic_pagination...")
+                urls = scrape_all_article_links(base_url, max_pages=max_pages)
+                print(f"[CRAWL] {len(urls)} articles found from {base_url}")
+                all_article_urls.extend(urls)
+                if urls:
+                    crawled_bases.append(base_url)
+            except Exception as e:
+                print(f"[⚠️] Could not scrape {base_url}: {e}")
+                unscraped_bases.append(base_url)
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
-    }
+    # Drop tag/category/author/section pages before they cost a fetch and LLM calls
+    classifier = get_url_classifier()
+    found = len(all_article_urls)
+    all_article_urls = classifier.filter(all_article_urls)
+    run_stats.incr("classifier", "rejected", found - len(all_article_urls))
+    print(f"[CRAWL] Classifier kept {len(all_article_urls)} of {found} URLs as articles")
+    all_article_urls.extend(unscraped_bases)
 
-    for url in all_article_urls:
-        try:
-            raw_html = requests.get(url, headers=headers, timeout=10).text
-        except Exception as e:
-            print(f"[⚠️] Failed to fetch {url}: {e}")
-            raw_html = ""
+    archive = get_archive()
+    found = len(all_article_urls)
+    if skip_processed:
+        all_article_urls = frontier.filter_unprocessed(all_article_urls)
+        print(f"[CRAWL] {found - len(all_article_urls)} of {found} URLs already processed, skipping them")
+
+    # Fetch every article concurrently over the pooled session
+    pages = fetch_many(all_article_urls)
+    print(f"[CRAWL] Fetched {sum(1 for v in pages.values() if v)}/{len(pages)} articles")
 
+    for url in all_article_urls:
+        raw_html = pages.get(url, "")
         uid = _unique_name(url)
-        save_raw_data(uid, url=url, raw_data=raw_html)
+
+        # Archive the response locally so later re-extraction needs no network
+        if raw_html:
+            archive.put(url, raw_html)
+            frontier.mark_fetched(url, uid)
+        row, is_article = _extracted_row(uid, url, raw_html)
+        save_raw_data_many([row])           # write-behind: merged and flushed in the background
+        if raw_html:
+            classifier.learn(url, is_article)   # refines this domain's URL templates
         unique_names.append(uid)
+    classifier.save()
 
     from pagination import paginate_urls
     paginate_urls(unique_names, model, user_hint, all_article_urls, abm_context)
+    for base_url in crawled_bases:
+        frontier.mark_listing_crawled(base_url, max_pages)
 
+    run_stats.report()
+    get_host_health().report()
     return unique_names
@@ -0,0 +1,181 @@
+# extraction_memo.py
+#
+# Memo of finished extractions (the enriched formatted_data scrape_urls saves),
+# keyed on the normalized article text, model, system prompt, field list and ABM
+# context. An article whose text is unchanged since an earlier run gets its
+# stored result back without any LLM call; a different prompt or ABM report gives
+# a different key, and storing under the new key drops the entries it replaces.
+# Each entry keeps an estimate of what producing it cost, so hits report dollars saved.
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import run_stats
+from assets import CACHE_DIR
+
+MEMO_PATH    = os.path.join(CACHE_DIR, "extraction_memo.sqlite")
+MEMO_VERSION = 1          # bump when the post-processing in scrape_urls changes its output
+
+# USD per 1M (input, output) tokens, used when litellm's price map has no entry
+MODEL_PRICES = {
+    "gpt-4o":        (2.50, 10.00),
+    "gpt-4.1-mini":  (0.40, 1.60),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+ENRICHMENT_CALLS = 4      # per listing: metadata, ABM correlation (x2), launch date
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memo (
+    key            TEXT PRIMARY KEY,
+    content_hash   TEXT,
+    model          TEXT,
+    fields_hash    TEXT,
+    prompt_hash    TEXT,
+    abm_hash       TEXT,
+    formatted_data TEXT,
+    cost           REAL,
+    created_at     REAL,
+    hits           INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_memo_content ON memo (content_hash, model, fields_hash);
+"""
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def content_hash(text: str) -> str:
+    """Hash of the article text with whitespace runs collapsed."""
+    return _sha(re.sub(r"\s+", " ", text or "").strip())
+
+
+def _tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    try:
+        from litellm import cost_per_token
+        prompt_cost, completion_cost = cost_per_token(
+            model=model, prompt_tokens=input_tokens, completion_tokens=output_tokens
+        )
+        return prompt_cost + completion_cost
+    except Exception:
+        per_in, per_out = MODEL_PRICES.get(model, MODEL_PRICES["gpt-4o"])
+        return (input_tokens * per_in + output_tokens * per_out) / 1_000_000
+
+
+def extraction_cost(model: str, article: str, prompt: str, abm_context: str, formatted_data: Dict) -> float:
+    """Rough dollars spent producing formatted_data: the extraction call plus the per-listing enrichment calls."""
+    input_tokens = _tokens(prompt) + _tokens(abm_context) + _tokens(article)
+    output_tokens = _tokens(json.dumps(formatted_data, default=str))
+    for listing in formatted_data.get("listings", []):
+        listing_tokens = _tokens(json.dumps(listing, default=str))
+        input_tokens += ENRICHMENT_CALLS * listing_tokens + _tokens(abm_context)
+        output_tokens += listing_tokens
+    return estimate_cost(model, input_tokens, output_tokens)
+
+
+class ExtractionMemo:
+    def __init__(self, path: str = MEMO_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    @staticmethod
+    def key_parts(text: str, model: str, prompt: str, fields: Iterable[str], abm_context: str) -> Dict[str, str]:
+        return {
+            "content_hash": content_hash(text),
+            "model": model,
+            "fields_hash": _sha(json.dumps(sorted(fields))),
+            "prompt_hash": _sha(f"{MEMO_VERSION}:{prompt}"),
+            "abm_hash": _sha(abm_context or ""),
+        }
+
+    @staticmethod
+    def key(parts: Dict[str, str]) -> str:
+        return _sha("|".join(parts[k] for k in ("content_hash", "model", "fields_hash", "prompt_hash", "abm_hash")))
+
+    def get_many(self, keys: List[str]) -> Dict[str, Tuple[Dict, float]]:
+        """{key: (formatted_data, cost)} for the keys that are memoized."""
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._db().execute(
+                    f"SELECT key, formatted_data, cost FROM memo WHERE key IN ({marks})", chunk
+                ).fetchall()
+                found.update({key: (json.loads(data), cost or 0.0) for key, data, cost in rows})
+            if found:
+                self._db().executemany("UPDATE memo SET hits = hits + 1 WHERE key = ?", [(k,) for k in found])
+                self._db().commit()
+        return found
+
+    def put(self, parts: Dict[str, str], formatted_data: Dict, cost: float):
+        """Store a result, replacing entries for the same article made with an older prompt or ABM context."""
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute(
+                    "DELETE FROM memo WHERE content_hash = ? AND model = ? AND fields_hash = ?",
+                    (parts["content_hash"], parts["model"], parts["fields_hash"]),
+                )
+                db.execute(
+                    """INSERT INTO memo (key, content_hash, model, fields_hash, prompt_hash, abm_hash,
+                                         formatted_data, cost, created_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (self.key(parts), parts["content_hash"], parts["model"], parts["fields_hash"],
+                     parts["prompt_hash"], parts["abm_hash"], json.dumps(formatted_data, default=str), cost,
+                     time.time()),
+                )
+
+    def invalidate(self, prompt: Optional[str] = None, abm_context: Optional[str] = None) -> int:
+        """Drop every entry made with this prompt and/or ABM context (all entries if neither is given)."""
+        where, args = [], []
+        if prompt is not None:
+            where.append("prompt_hash = ?")
+            args.append(_sha(f"{MEMO_VERSION}:{prompt}"))
+        if abm_context is not None:
+            where.append("abm_hash = ?")
+            args.append(_sha(abm_context))
+        with self._lock:
+            with self._db() as db:
+                return db.execute("DELETE FROM memo" + (" WHERE " + " AND ".join(where) if where else ""), args).rowcount
+
+
+def record_lookup(hits: int, misses: int, saved: float):
+    run_stats.incr("extraction_memo", "hits", hits)
+    run_stats.incr("extraction_memo", "misses", misses)
+    run_stats.incr("extraction_memo", "saved_microdollars", int(saved * 1_000_000))
+    total = hits + misses
+    if total:
+        print(f"[Memo] {hits}/{total} articles served from the extraction memo "
+              f"({hits / total:.0%} hit rate, ~${saved:.4f} of LLM calls saved)")
+
+
+_memo: Optional[ExtractionMemo] = None
+_memo_lock = threading.Lock()
+
+
+def get_extraction_memo() -> ExtractionMemo:
+    global _memo
+    if _memo is None:
+        with _memo_lock:
+            if _memo is None:
+                _memo = ExtractionMemo()
+    return _memo
@@ -0,0 +1,226 @@
+# feed_discovery.py
+#
+# Fast path for article discovery: RSS/Atom feeds advertised by the listing page
+# (<link rel="alternate">) and sitemaps listed in robots.txt. Feeds are parsed
+# incrementally with ElementTree's pull parser, so large sitemaps never become a
+# full tree. generic_pagination.scrape_all_article_links only falls back to
+# listing-page pagination (and Playwright) when nothing is found here.
+
+import gzip
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from typing import Dict, Iterator, List, NamedTuple, Optional
+from urllib.parse import urljoin, urlparse
+
+import run_stats
+from http_client import HTML_CONTENT_TYPES, http_get
+from politeness import get_scheduler
+from strategy_profile import domain_of
+
+FEED_CONTENT_TYPES = (
+    "application/rss+xml", "application/atom+xml", "application/xml", "text/xml",
+    "application/x-gzip", "application/gzip", "application/octet-stream",
+)
+FEED_LINK_TYPES    = ("application/rss+xml", "application/atom+xml")
+FEED_MAX_BYTES     = 10 * 1024 * 1024   # sitemaps can be large; still capped
+PARSE_CHUNK        = 64 * 1024
+MAX_FEED_ITEMS     = 200
+MAX_CHILD_SITEMAPS = 3                  # newest children of a sitemap index that are read
+NON_ARTICLE_RE     = re.compile(r"/(tag|category|author|page|topics?)/|/feed/?$|\.(xml|jpg|png|pdf)$", re.I)
+
+
+class FeedEntry(NamedTuple):
+    url: str
+    published: Optional[datetime]
+
+
+class _FeedLinkParser(HTMLParser):
+    """Collects <link rel="alternate" type="application/rss+xml|atom+xml"> hrefs from <head>."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.hrefs: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "body":
+            raise StopIteration   # feed links live in <head>; stop tokenizing here
+        if tag != "link":
+            return
+        attrs = {k: (v or "") for k, v in attrs}
+        if "alternate" in attrs.get("rel", "").lower().split() \
+                and attrs.get("type", "").lower() in FEED_LINK_TYPES and attrs.get("href"):
+            self.hrefs.append(attrs["href"])
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1].lower()
+
+
+def _parse_date(value: str) -> Optional[datetime]:
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)            # RSS: RFC 822
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))   # Atom / sitemap: ISO 8601
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _iter_elements(body: bytes) -> Iterator[ET.Element]:
+    """Yield completed elements as the body is fed in chunks; each is cleared after use."""
+    if body[:2] == b"\x1f\x8b":
+        body = gzip.decompress(body)
+    parser = ET.XMLPullParser(events=("end",))
+    try:
+        for i in range(0, len(body), PARSE_CHUNK):
+            parser.feed(body[i:i + PARSE_CHUNK])
+            for _, elem in parser.read_events():
+                yield elem
+        parser.close()
+        for _, elem in parser.read_events():
+            yield elem
+    except ET.ParseError as e:
+        print(f"[Feed] Parse error (keeping entries read so far): {e}")
+
+
+def parse_feed(body: bytes) -> Dict[str, List]:
+    """
+    Parse RSS, Atom, a urlset sitemap (incl. news sitemaps) or a sitemap index.
+    Returns {"entries": [FeedEntry], "sitemaps": [FeedEntry]} (the latter for indexes).
+    """
+    entries, sitemaps = [], []
+    for elem in _iter_elements(body):
+        name = _local(elem.tag)
+        if name not in ("item", "entry", "url", "sitemap"):
+            continue
+        url, published = None, None
+        for child in elem:
+            child_name = _local(child.tag)
+            if child_name in ("link", "loc") and url is None:
+                # Atom puts the URL in href (prefer rel="alternate"); RSS / sitemaps in the text
+                if child.get("href") and child.get("rel", "alternate") == "alternate":
+                    url = child.get("href")
+                elif (child.text or "").strip():
+                    url = child.text.strip()
+            elif child_name in ("pubdate", "published", "publication_date", "date", "updated", "lastmod"):
+                published = published or _parse_date(child.text)
+            elif child_name == "news":
+                for sub in child:
+                    if _local(sub.tag) == "publication_date":
+                        published = _parse_date(sub.text) or published
+        if url:
+            (sitemaps if name == "sitemap" else entries).append(FeedEntry(url, published))
+        elem.clear()
+    return {"entries": entries, "sitemaps": sitemaps}
+
+
+def _fetch_feed(url: str) -> Optional[Dict[str, List]]:
+    try:
+        resp = http_get(url, accept=FEED_CONTENT_TYPES, max_bytes=FEED_MAX_BYTES)
+    except Exception as e:
+        print(f"[Feed] Could not fetch {url}: {e}")
+        return None
+    if resp.status_code != 200 or not resp.content:
+        return None
+    run_stats.incr("discovery", "feeds_fetched")
+    return parse_feed(resp.content)
+
+
+def feed_urls_from_html(html: str, base_url: str) -> List[str]:
+    parser = _FeedLinkParser()
+    try:
+        parser.feed(html)
+    except StopIteration:
+        pass
+    # Comment feeds are advertised the same way but never list articles
+    return [urljoin(base_url, h) for h in parser.hrefs if "comments" not in h.lower()]
+
+
+def sitemap_urls_from_robots(base_url: str) -> List[str]:
+    try:
+        return list(get_scheduler().robots_for(base_url).site_maps() or [])
+    except Exception as e:
+        print(f"[Feed] Could not read robots.txt sitemaps for {base_url}: {e}")
+        return []
+
+
+def _newest(entries: List[FeedEntry]) -> List[FeedEntry]:
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    return sorted(entries, key=lambda e: e.published or oldest, reverse=True)
+
+
+def _from_sitemaps(sitemap_urls: List[str]) -> List[FeedEntry]:
+    entries = []
+    for sitemap_url in sitemap_urls:
+        parsed = _fetch_feed(sitemap_url)
+        if not parsed:
+            continue
+        entries.extend(parsed["entries"])
+        for child in _newest(parsed["sitemaps"])[:MAX_CHILD_SITEMAPS]:
+            child_parsed = _fetch_feed(child.url)
+            if child_parsed:
+                entries.extend(child_parsed["entries"])
+        if entries:
+            break
+    return entries
+
+
+def _section_prefix(base_url: str) -> str:
+    """Path prefix of the listing a crawl started from ("" for the site root), without a /page/N suffix."""
+    path = re.sub(r"/page/\d+/?$", "/", urlparse(base_url).path or "/")
+    return path.rstrip("/")
+
+
+def _in_section(url: str, prefix: str) -> bool:
+    path = urlparse(url).path.rstrip("/")
+    return not prefix or path.startswith(prefix + "/")
+
+
+def discover_articles(base_url: str, html: Optional[str] = None, limit: int = MAX_FEED_ITEMS) -> List[FeedEntry]:
+    """
+    Article URLs (newest first, with publish dates when known) from the feeds the
+    listing page advertises, else from robots.txt sitemaps. Sitemaps cover the
+    whole site, so for a section listing (e.g. /category/robotics/) only entries
+    under that path are kept. Empty when nothing is found, in which case callers
+    fall back to pagination.
+    """
+    domain = domain_of(base_url)
+    if html is None:
+        try:
+            html = http_get(base_url, accept=HTML_CONTENT_TYPES).text
+        except Exception as e:
+            print(f"[Feed] Could not fetch {base_url}: {e}")
+            html = ""
+
+    entries: List[FeedEntry] = []
+    for feed_url in feed_urls_from_html(html, base_url):
+        parsed = _fetch_feed(feed_url)
+        if parsed and parsed["entries"]:
+            print(f"[Feed] {len(parsed['entries'])} entries from {feed_url}")
+            entries = parsed["entries"]
+            break
+    else:
+        prefix = _section_prefix(base_url)
+        entries = [e for e in _from_sitemaps(sitemap_urls_from_robots(base_url)) if _in_section(e.url, prefix)]
+        if entries:
+            print(f"[Feed] {len(entries)} entries from sitemaps for {domain}{prefix}")
+
+    seen, articles = set(), []
+    for entry in _newest(entries):
+        url = entry.url.split("#")[0]
+        if url in seen or domain_of(url) != domain or NON_ARTICLE_RE.search(urlparse(url).path):
+            continue
+        seen.add(url)
+        articles.append(entry._replace(url=url))
+        if len(articles) >= limit:
+            break
+
+    run_stats.incr("discovery", "feed_hit" if articles else "feed_miss")
+    return articles
@@ -0,0 +1,141 @@
+# frontier.py
+#
+# Persistent URL frontier keyed on the canonical URL (url_utils.normalize_url).
+# Records when each article was fetched and extracted so later runs only pay for
+# new articles, and lets listing pagination stop on pages with nothing new.
+# Listing pages whose crawl ran to the end are recorded too, so an unchanged
+# listing is only skipped when nothing from it was left unfinished.
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional
+from urllib.parse import urlparse
+
+from assets import CACHE_DIR
+from url_utils import normalize_url
+
+FRONTIER_PATH = os.path.join(CACHE_DIR, "frontier.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    canonical_url  TEXT PRIMARY KEY,
+    url            TEXT,
+    unique_name    TEXT,
+    first_seen     REAL,
+    last_fetched   REAL,
+    last_extracted REAL
+);
+CREATE INDEX IF NOT EXISTS idx_frontier_unique_name ON frontier (unique_name);
+CREATE TABLE IF NOT EXISTS listing_crawls (
+    canonical_url TEXT PRIMARY KEY,
+    max_pages     INTEGER,
+    completed_at  REAL
+);
+"""
+
+
+def unique_name_for(url: str) -> str:
+    """Stable unique_name for a URL: the same article always maps to the same row."""
+    canonical = normalize_url(url)
+    parsed = urlparse(canonical)
+    slug = re.sub(r'[^A-Za-z0-9_]+', '_', (parsed.netloc + parsed.path))[:100]
+    return f"{hashlib.sha1(canonical.encode()).hexdigest()[:8]}_{slug}"
+
+
+class Frontier:
+    def __init__(self, path: str = FRONTIER_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _known(self, canonical_urls: List[str], column: Optional[str] = None) -> set:
+        if not canonical_urls:
+            return set()
+        where = f" AND {column} IS NOT NULL" if column else ""
+        found = set()
+        with self._lock:
+            for i in range(0, len(canonical_urls), 500):
+                chunk = canonical_urls[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._db().execute(
+                    f"SELECT canonical_url FROM frontier WHERE canonical_url IN ({marks}){where}", chunk
+                ).fetchall()
+                found.update(r[0] for r in rows)
+        return found
+
+    def filter_unprocessed(self, urls: Iterable[str]) -> List[str]:
+        """Drop URLs already extracted in an earlier run, and duplicates by canonical form."""
+        by_canonical = {}
+        for u in urls:
+            by_canonical.setdefault(normalize_url(u), u)
+        done = self._known(list(by_canonical), "last_extracted")
+        return [u for c, u in by_canonical.items() if c not in done]
+
+    def all_seen(self, urls: Iterable[str]) -> bool:
+        """True if every URL is already in the frontier (and there is at least one)."""
+        canonical = list({normalize_url(u) for u in urls})
+        return bool(canonical) and len(self._known(canonical)) == len(canonical)
+
+    def mark_fetched(self, url: str, unique_name: str):
+        now = time.time()
+        with self._lock:
+            self._db().execute(
+                """INSERT INTO frontier (canonical_url, url, unique_name, first_seen, last_fetched)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(canonical_url) DO UPDATE SET
+                       url = excluded.url, unique_name = excluded.unique_name, last_fetched = excluded.last_fetched""",
+                (normalize_url(url), url, unique_name, now, now),
+            )
+            self._db().commit()
+
+    def url_for(self, unique_name: str) -> Optional[str]:
+        """The URL last fetched under unique_name, if known."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT url FROM frontier WHERE unique_name = ? ORDER BY last_fetched DESC LIMIT 1", (unique_name,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def mark_extracted(self, unique_name: str):
+        with self._lock:
+            self._db().execute(
+                "UPDATE frontier SET last_extracted = ? WHERE unique_name = ?", (time.time(), unique_name)
+            )
+            self._db().commit()
+
+    def mark_listing_crawled(self, base_url: str, max_pages: int):
+        """Record that every article listed on base_url (up to max_pages) went through a full run."""
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO listing_crawls VALUES (?, ?, ?)", (normalize_url(base_url), max_pages, time.time())
+            )
+            self._db().commit()
+
+    def listing_crawl_complete(self, base_url: str, max_pages: int) -> bool:
+        """True if an earlier run finished crawling base_url at least max_pages deep."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT max_pages FROM listing_crawls WHERE canonical_url = ?", (normalize_url(base_url),)
+            ).fetchone()
+        return bool(row) and row[0] >= max_pages
+
+
+_frontier: Optional[Frontier] = None
+
+
+def get_frontier() -> Frontier:
+    global _frontier
+    if _frontier is None:
+        _frontier = Frontier()
+    return _frontier
@@ -1,57 +1,163 @@
 # generic_pagination.py
 
-from urllib.parse import urljoin
-from bs4 import BeautifulSoup
-import requests
+import asyncio
 import re
 import time
-from typing import List
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from typing import Callable, List, Optional
 from requests.exceptions import RequestException
+from http_client import HTML_CONTENT_TYPES, BodyRejected, http_get
+from host_health import HostUnavailable, get_host_health, parse_retry_after, retry_delay
+from browser_pool import pooled_page
+from scroll_engine import scroll_until_stable
+from frontier import get_frontier
+from politeness import RobotsDisallowed, get_scheduler
+from link_extractor import extract_links as scan_links
+from strategy_profile import get_profiles
+from feed_discovery import discover_articles
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
 
 def safe_request(url, retries=3, timeout=10):
-    """Retry-safe request handler."""
-    attempt = 0
-    while attempt < retries:
+    """
+    Retry-safe request handler. Transient failures are retried with jittered
+    exponential backoff (honoring Retry-After); it gives up at once when the
+    host's circuit is open (see host_health), robots.txt disallows the URL, or the
+    status is not retryable.
+    """
+    for attempt in range(retries):
+        retry_after = None
         try:
-            response = requests.get(url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
-            response.raise_for_status()
-            return response
+            response = http_get(url, timeout=timeout, accept=HTML_CONTENT_TYPES)
+            if response.status_code < 400:
+                return response
+            if response.status_code not in RETRY_STATUSES:
+                print(f"[WARN] {url} returned {response.status_code}, not retrying")
+                return None
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            print(f"[WARN] {url} returned {response.status_code} (Retry {attempt+1}/{retries})")
+        except (BodyRejected, HostUnavailable, RobotsDisallowed) as e:
+            print(f"[WARN] Skipping {url}: {e}")
+            return None
         except (RequestException, Exception) as e:
             print(f"[WARN] Error fetching {url}: {e} (Retry {attempt+1}/{retries})")
-            attempt += 1
-            time.sleep(2)
+        if attempt + 1 == retries or get_host_health().is_open(url):
+            break
+        time.sleep(retry_delay(attempt, retry_after))
+    return None
+
+
+FEED_ITEMS_PER_PAGE    = 20   # feed entries taken per requested listing page
+SPECULATIVE_WINDOW     = 2    # pages fetched concurrently in the first window
+MAX_SPECULATIVE_WINDOW = 8    # window doubles up to this while pages stay valid
+
+
+async def _fetch_listing_page(url: str, retries: int = 2):
+    """One listing page; returns None on 4xx (end of pagination) or repeated errors."""
+    for attempt in range(retries):
+        # Politeness wait happens here (not in a worker thread) so cancellation skips the request
+        try:
+            get_host_health().check(url)
+            await get_scheduler().wait_async(url)
+            response = await asyncio.to_thread(http_get, url, polite=False, accept=HTML_CONTENT_TYPES)
+        except (BodyRejected, HostUnavailable, RobotsDisallowed) as e:
+            print(f"[WARN] Skipping {url}: {e}")
+            return None
+        except Exception as e:
+            print(f"[WARN] Error fetching {url}: {e} (Retry {attempt+1}/{retries})")
+            continue
+        if response.status_code < 400:
+            return response
+        if response.status_code < 500:
+            return None
+        print(f"[WARN] {url} returned {response.status_code} (Retry {attempt+1}/{retries})")
     return None
 
 
+async def _speculative_paginate_async(page_url, extract_links, max_pages, window, max_window):
+    pages: List[List[str]] = []
+    seen_pages = set()
+    next_page = 1
+
+    while next_page <= max_pages:
+        batch = list(range(next_page, min(next_page + window, max_pages + 1)))
+        tasks = {i: asyncio.create_task(_fetch_listing_page(page_url(i))) for i in batch}
+        stop = False
+        try:
+            for i in batch:
+                url = page_url(i)
+                response = await tasks[i]
+                links = extract_links(response.text, url) if response is not None else []
+                fingerprint = frozenset(links)
+
+                if not links or fingerprint in seen_pages:
+                    print(f"[Pagination] Page {i} is missing, empty or a repeat, stopping.")
+                    stop = True
+                    break
+
+                seen_pages.add(fingerprint)
+                pages.append(links)
+                if get_frontier().all_seen(links):
+                    print(f"[Pagination] {url} has no unseen articles, stopping.")
+                    stop = True
+                    break
+        finally:
+            pending = [t for t in tasks.values() if not t.done()]
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if stop:
+            break
+        next_page += len(batch)
+        window = min(window * 2, max_window)
+
+    return pages
+
+
+def speculative_paginate(
+    page_url: Callable[[int], str],
+    extract_links: Callable[[str, str], List[str]],
+    max_pages: int,
+    window: int = SPECULATIVE_WINDOW,
+    max_window: int = MAX_SPECULATIVE_WINDOW,
+) -> List[List[str]]:
+    """
+    Fetch listing pages page_url(1..max_pages) a window at a time, concurrently.
+    Pages are consumed in order; the first page that 4xx's, has no article links,
+    repeats an earlier page or contains only already-seen articles ends pagination
+    and cancels the rest of the window. The window doubles while pages stay valid.
+    Returns the article links of each valid page, in page order.
+    """
+    return asyncio.run(_speculative_paginate_async(page_url, extract_links, max_pages, window, max_window))
+
+
 def looks_like_static_pagination(url: str) -> bool:
     """Detect if URL has static pagination format."""
     return bool(re.search(r'(page|p)(=|/)(\d+)', url))
 
 
-def static_pagination_scrape(base_url: str, max_pages: int = 10) -> List[str]:
-    """Handle static pagination (e.g., /page/2 or ?page=2)."""
-    seen_urls = set()
-    article_urls = []
-    
-    for i in range(1, max_pages + 1):
-        new_url = re.sub(r'(page|p)(=|/)(\d+)', f"\\1\\2{i}", base_url)
-        if new_url in seen_urls:
-            break
+def static_page_url(base_url: str, i: int) -> str:
+    """
+    Listing page i of base_url: the page number in /page/N or ?page=N replaced,
+    else WordPress-style /page/N/ appended for i > 1.
+    """
+    if looks_like_static_pagination(base_url):
+        return re.sub(r'(page|p)(=|/)(\d+)', rf"\g<1>\g<2>{i}", base_url)
+    return base_url if i == 1 else f"{base_url.rstrip('/')}/page/{i}/"
 
-        response = safe_request(new_url)
-        if not response:
-            break
 
-        seen_urls.add(new_url)
-        soup = BeautifulSoup(response.text, "html.parser")
-        for link in soup.find_all("a", href=True):
-            href = urljoin(new_url, link["href"])
-            if re.search(r"(20\d{2}|article|news|robot)", href, re.I):
-                article_urls.append(href)
+def static_pagination_scrape(base_url: str, max_pages: int = 10) -> List[str]:
+    """
+    Handle static pagination (e.g., /page/2 or ?page=2). A base URL without a page
+    number gets WordPress-style /page/N/ appended for N > 1.
+    """
+    def extract_links(html: str, url: str) -> List[str]:
+        return scan_links(html, url, classify=True).links
 
-    return list(set(article_urls))
+    pages = speculative_paginate(lambda i: static_page_url(base_url, i), extract_links, max_pages)
+    return list({href for links in pages for href in links})
 
 
 def link_based_scrape(base_url: str, max_pages: int = 10) -> List[str]:
@@ -65,21 +171,18 @@ def link_based_scrape(base_url: str, max_pages: int = 10) -> List[str]:
         if not response:
             break
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        for link in soup.find_all("a", href=True):
-            href = urljoin(current_url, link["href"])
-            if href not in seen_urls and re.search(r"(20\d{2}|article|news|robot)", href, re.I):
+        # Article links and the next page link come from the same pass
+        scan = scan_links(response.text, current_url, classify=True)
+        for href in scan.links:
+            if href not in seen_urls:
                 article_urls.append(href)
                 seen_urls.add(href)
 
-        # Find the next page link
-        next_link = None
-        for link in soup.find_all("a", href=True):
-            text = link.get_text(strip=True).lower()
-            if ("next" in text or text in {">", "»"} or link.get("rel") == ["next"]):
-                next_link = urljoin(current_url, link["href"])
-                break
+        if get_frontier().all_seen(scan.links):
+            print(f"[Pagination] {current_url} has no unseen articles, stopping.")
+            break
 
+        next_link = scan.next_url
         if not next_link or next_link in seen_urls:
             break
 
@@ -88,42 +191,19 @@ def link_based_scrape(base_url: str, max_pages: int = 10) -> List[str]:
     return list(set(article_urls))
 
 
-def playwright_scrape(start_url: str, max_scrolls: int = 5) -> List[str]:
+def playwright_scrape(start_url: str, max_scrolls: int = 5, target_links: Optional[int] = None) -> List[str]:
     """Handle JS-based pagination using Playwright: scroll + 'Load More' button."""
     article_urls = set()
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
+        get_scheduler().wait(start_url)
+        with pooled_page(start_url) as page:
             page.goto(start_url, timeout=60000)
             page.wait_for_load_state("networkidle")
 
-            for scroll_num in range(max_scrolls):
-                print(f"[Scroll] Attempt {scroll_num+1}/{max_scrolls}…")
-                
-                # Scroll
-                page.mouse.wheel(0, 1000)
-                page.wait_for_timeout(1500)
-
-                # Try clicking "Load More"
-                load_more = page.locator("button:has-text('Load More')")
-                if load_more.count() > 0:
-                    try:
-                        load_more.first.click()
-                        page.wait_for_timeout(2000)
-                    except PlaywrightTimeoutError:
-                        print("[Playwright] Timeout clicking Load More.")
-                        break
+            scroll_until_stable(page, max_steps=max_scrolls, target_links=target_links)
 
             # Final HTML parse
-            html = page.content()
-            soup = BeautifulSoup(html, "html.parser")
-            for link in soup.find_all("a", href=True):
-                href = urljoin(start_url, link["href"])
-                if re.search(r"(20\d{2}|article|news|robot)", href, re.I):
-                    article_urls.add(href)
-
-            browser.close()
+            article_urls.update(scan_links(page.content(), start_url, classify=True).links)
 
     except Exception as e:
         print(f"[Playwright Error] {e}")
@@ -132,25 +212,64 @@ def playwright_scrape(start_url: str, max_scrolls: int = 5) -> List[str]:
     return list(article_urls)
 
 
+def _run_strategy(strategy: str, base_url: str, max_pages: int) -> List[str]:
+    if strategy == "static":
+        return static_pagination_scrape(base_url, max_pages)
+    if strategy == "link":
+        return link_based_scrape(base_url, max_pages)
+    if strategy == "load_more":
+        from playwright_scroll_scraper import scrape_articles_with_load_more
+        return scrape_articles_with_load_more(base_url, max_clicks=max_pages)
+    return playwright_scrape(base_url, max_scrolls=max_pages)
+
+
+def _timed_strategy(strategy: str, base_url: str, max_pages: int, probe: bool = False) -> List[str]:
+    """Run a strategy and record its latency and link yield in the domain profile."""
+    started = time.perf_counter()
+    links = _run_strategy(strategy, base_url, max_pages)
+    get_profiles().record(base_url, strategy, len(links), time.perf_counter() - started, probe=probe)
+    return links
+
+
+def _detect_and_scrape(base_url: str, max_pages: int) -> List[str]:
+    """Auto-detect the pagination type from the page itself (the probe path)."""
+    if looks_like_static_pagination(base_url):
+        print("[🧠 Pagination] Detected static pattern")
+        return _timed_strategy("static", base_url, max_pages, probe=True)
+
+    response = safe_request(base_url)
+    if not response:
+        return []
+
+    if scan_links(response.text, base_url).has_pagination_hint:
+        print("[🧠 Pagination] Detected link-based pagination")
+        return _timed_strategy("link", base_url, max_pages, probe=True)
+
+    print("[🧠 Pagination] Falling back to Playwright scroll/click")
+    return _timed_strategy("scroll", base_url, max_pages, probe=True)
+
+
 def scrape_all_article_links(base_url: str, max_pages: int = 10) -> List[str]:
-    """Auto-detect pagination type and scrape article URLs."""
+    """
+    Article URLs from the site's RSS/Atom feed or sitemap (see feed_discovery).
+    Without one, scrape with the domain's best known strategy (see strategy_profile),
+    falling back to auto-detection when there is none, it is due for a re-probe,
+    or it yields nothing.
+    """
     try:
-        if looks_like_static_pagination(base_url):
-            print("[🧠 Pagination] Detected static pattern")
-            return static_pagination_scrape(base_url, max_pages)
-        else:
-            response = safe_request(base_url)
-            if not response:
-                return []
-
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            if soup.find("a", text=re.compile("next|more|>|»", re.I)):
-                print("[🧠 Pagination] Detected link-based pagination")
-                return link_based_scrape(base_url, max_pages)
-            else:
-                print("[🧠 Pagination] Falling back to Playwright scroll/click")
-                return playwright_scrape(base_url, max_scrolls=max_pages)
+        entries = discover_articles(base_url, limit=max_pages * FEED_ITEMS_PER_PAGE)
+        if entries:
+            print(f"[🧠 Pagination] {len(entries)} articles from feed/sitemap, skipping pagination")
+            return [e.url for e in entries]
+
+        strategy = get_profiles().best_strategy(base_url)
+        if strategy:
+            print(f"[🧠 Pagination] Using profiled strategy '{strategy}'")
+            links = _timed_strategy(strategy, base_url, max_pages)
+            if links:
+                return links
+            print(f"[🧠 Pagination] '{strategy}' found nothing, re-detecting")
+        return _detect_and_scrape(base_url, max_pages)
 
     except Exception as e:
         print(f"[⚠️ Universal Pagination Error] {e}")
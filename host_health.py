@@ -0,0 +1,199 @@
+# host_health.py
+#
+# Per-host health tracking and circuit breaker, shared by every fetch through
+# http_client.http_get. Timeouts, connection errors, 5xx, 403 and 429 count as
+# failures. Enough consecutive failures (or a high error rate over the recent
+# window) opens the host's circuit: requests fail fast with HostUnavailable until a
+# jittered, exponentially growing cool-down (or the server's Retry-After) passes.
+# Then one probe request is let through (half-open); success closes the circuit,
+# failure re-opens it with a longer cool-down.
+
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from requests.exceptions import RequestException
+
+import run_stats
+
+FAILURE_THRESHOLD = 3        # consecutive failures that open the circuit
+WINDOW            = 20       # recent outcomes kept per host
+MIN_SAMPLES       = 5
+MAX_ERROR_RATE    = 0.5      # error rate over the window that opens the circuit
+BASE_COOLDOWN     = 5.0      # seconds; doubles with every consecutive re-open
+MAX_COOLDOWN      = 300.0
+BASE_RETRY_DELAY  = 1.0      # per-request retry backoff (see retry_delay)
+MAX_RETRY_DELAY   = 30.0
+MAX_RETRY_AFTER   = 600.0    # never honor a Retry-After longer than this
+
+FAILURE_STATUSES = {403, 429, 500, 502, 503, 504}
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class HostUnavailable(RequestException):
+    """The host's circuit is open; the request was not sent."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Delay before retry number attempt (0-based): Retry-After if given, else jittered exponential."""
+    if retry_after is not None:
+        return min(retry_after, MAX_RETRY_AFTER)
+    return min(BASE_RETRY_DELAY * 2 ** attempt, MAX_RETRY_DELAY) * random.uniform(0.5, 1.0)
+
+
+class _Host:
+    __slots__ = ("state", "consecutive", "outcomes", "opens", "open_until", "probing", "last_error")
+
+    def __init__(self):
+        self.state = CLOSED
+        self.consecutive = 0
+        self.outcomes = deque(maxlen=WINDOW)   # True = failure
+        self.opens = 0                         # consecutive opens without a recovery
+        self.open_until = 0.0
+        self.probing = False
+        self.last_error = ""
+
+
+class HostHealth:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, _Host] = {}
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def _host(self, url: str) -> _Host:
+        key = self._key(url)
+        host = self._hosts.get(key)
+        if host is None:
+            host = self._hosts[key] = _Host()
+        return host
+
+    def is_open(self, url: str) -> bool:
+        """True while requests to url's host would fail fast (does not claim the probe)."""
+        with self._lock:
+            host = self._hosts.get(self._key(url))
+            if host is None or host.state == CLOSED:
+                return False
+            return host.probing or time.time() < host.open_until
+
+    def check(self, url: str):
+        """Raise HostUnavailable while url's host is failing fast."""
+        if self.is_open(url):
+            run_stats.incr("host_health", "fast_failed")
+            raise HostUnavailable(f"circuit open for {self._key(url)}")
+
+    def before_request(self, url: str):
+        """Raise HostUnavailable if the circuit is open; in half-open, let one probe through."""
+        with self._lock:
+            host = self._host(url)
+            if host.state == CLOSED:
+                return
+            if host.probing or time.time() < host.open_until:
+                run_stats.incr("host_health", "fast_failed")
+                raise HostUnavailable(f"circuit open for {self._key(url)} ({host.last_error})")
+            host.state = HALF_OPEN
+            host.probing = True
+            run_stats.incr("host_health", "half_open_probes")
+
+    def release(self, url: str):
+        """Give back a half-open probe slot when the request failed locally, before any outcome was seen."""
+        with self._lock:
+            host = self._hosts.get(self._key(url))
+            if host is not None:
+                host.probing = False
+
+    def record(self, url: str, status: Optional[int] = None, error: Optional[Exception] = None,
+               retry_after: Optional[float] = None):
+        """Record the outcome of a request: a status code, or the exception it raised."""
+        failed = error is not None or status in FAILURE_STATUSES
+        with self._lock:
+            host = self._host(url)
+            host.outcomes.append(failed)
+            if status in (403, 429):
+                run_stats.incr("host_health", f"status_{status}")
+            if isinstance(error, Exception) and "timeout" in type(error).__name__.lower():
+                run_stats.incr("host_health", "timeouts")
+
+            if not failed:
+                if host.state != CLOSED:
+                    print(f"[HostHealth] {self._key(url)} recovered, closing circuit")
+                    run_stats.incr("host_health", "circuits_closed")
+                host.state, host.consecutive, host.opens, host.probing = CLOSED, 0, 0, False
+                return
+
+            run_stats.incr("host_health", "failures")
+            host.consecutive += 1
+            host.last_error = f"HTTP {status}" if error is None else type(error).__name__
+            window_failures = sum(host.outcomes)
+            should_open = (
+                host.state == HALF_OPEN
+                or host.consecutive >= FAILURE_THRESHOLD
+                or (len(host.outcomes) >= MIN_SAMPLES and window_failures / len(host.outcomes) >= MAX_ERROR_RATE)
+                or (retry_after is not None and status in (429, 503))
+            )
+            if should_open:
+                self._open(url, host, retry_after)
+
+    def _open(self, url: str, host: _Host, retry_after: Optional[float]):
+        if retry_after is not None:
+            cooldown = min(retry_after, MAX_RETRY_AFTER)
+            run_stats.incr("host_health", "retry_after_honored")
+        else:
+            cooldown = min(BASE_COOLDOWN * 2 ** host.opens, MAX_COOLDOWN) * random.uniform(0.5, 1.0)
+        host.state, host.probing = OPEN, False
+        host.opens += 1
+        host.open_until = time.time() + cooldown
+        run_stats.incr("host_health", "circuits_opened")
+        print(f"[HostHealth] Opening circuit for {self._key(url)} for {cooldown:.0f}s ({host.last_error})")
+
+    def summary(self) -> Dict[str, Dict]:
+        """State of every host that has seen a failure."""
+        now = time.time()
+        with self._lock:
+            return {
+                key: {
+                    "state": h.state,
+                    "error_rate": round(sum(h.outcomes) / len(h.outcomes), 2) if h.outcomes else 0.0,
+                    "consecutive_failures": h.consecutive,
+                    "retry_in": max(round(h.open_until - now), 0) if h.state != CLOSED else 0,
+                    "last_error": h.last_error,
+                }
+                for key, h in self._hosts.items() if any(h.outcomes) or h.state != CLOSED
+            }
+
+    def report(self):
+        for key, info in sorted(self.summary().items()):
+            print(f"[HostHealth] {key}: {info['state']}, error rate {info['error_rate']:.0%}, "
+                  f"last error {info['last_error'] or '-'}, retry in {info['retry_in']}s")
+
+
+_health: Optional[HostHealth] = None
+_health_lock = threading.Lock()
+
+
+def get_host_health() -> HostHealth:
+    global _health
+    if _health is None:
+        with _health_lock:
+            if _health is None:
+                _health = HostHealth()
+    return _health
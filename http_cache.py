@@ -0,0 +1,114 @@
+# http_cache.py
+#
+# On-disk conditional-request cache for the fetch layer. Stores the body plus
+# ETag / Last-Modified of every cacheable 200 response; later fetches send
+# If-None-Match / If-Modified-Since and a 304 is answered from disk.
+# Total size is bounded; least-recently-used entries are evicted first.
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+import run_stats
+from assets import CACHE_DIR
+
+CACHE_PATH      = os.path.join(CACHE_DIR, "http_cache.sqlite")
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    content_type  TEXT,
+    encoding      TEXT,
+    body          BLOB,
+    size          INTEGER,
+    accessed_at   REAL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at);
+"""
+
+
+class HttpCache:
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = MAX_CACHE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT etag, last_modified, content_type, encoding, body FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return None
+        etag, last_modified, content_type, encoding, body = row
+        return {
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": content_type,
+            "encoding": encoding,
+            "body": zlib.decompress(body),
+        }
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def touch(self, url: str):
+        with self._lock:
+            self._db().execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._db().commit()
+
+    def store(self, url: str, headers, body: bytes, encoding: Optional[str]):
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not (etag or last_modified):
+            return  # nothing to revalidate with
+        blob = zlib.compress(body)
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, headers.get("Content-Type"), encoding, blob, len(blob), time.time()),
+            )
+            self._evict(db)
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in db.execute("SELECT url, size FROM entries ORDER BY accessed_at").fetchall():
+            db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            run_stats.incr("http_cache", "evicted")
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+_cache: Optional[HttpCache] = None
+
+
+def get_http_cache() -> HttpCache:
+    global _cache
+    if _cache is None:
+        _cache = HttpCache()
+    return _cache
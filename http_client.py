@@ -0,0 +1,268 @@
+# http_client.py
+#
+# Shared HTTP layer: one pooled keep-alive requests.Session for the sync callers
+# and an asyncio fan-out (fetch_many) on top of the same session for bulk fetches.
+
+import asyncio
+import codecs
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+import run_stats
+from host_health import get_host_health, parse_retry_after
+from http_cache import get_http_cache
+from politeness import get_scheduler, interleave_by_host
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
+}
+
+DEFAULT_TIMEOUT    = 10
+MAX_CONCURRENCY    = 16    # global cap on in-flight requests
+MAX_PER_HOST       = 4     # cap per netloc so one site never gets the whole pool
+POOL_CONNECTIONS   = 32    # number of host pools kept alive
+POOL_MAXSIZE       = MAX_CONCURRENCY
+
+MAX_BODY_BYTES     = 2 * 1024 * 1024   # stop reading a body past this many bytes
+CHUNK_SIZE         = 64 * 1024
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([A-Za-z0-9_.:-]+)""", re.I)
+
+
+class BodyRejected(requests.exceptions.RequestException):
+    """The response's Content-Type is not one the caller accepts."""
+
+
+class FetchedResponse(requests.Response):
+    """A requests.Response whose body was read (capped and decoded) by http_client."""
+
+    from_cache = False
+    truncated = False
+    _decoded: Optional[str] = None
+
+    @property
+    def text(self):
+        return self._decoded if self._decoded is not None else super().text
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session (created lazily)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                s.headers.update(DEFAULT_HEADERS)
+                _session = s
+    return _session
+
+
+def close_session():
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _response_from_cache(url: str, entry: Dict) -> FetchedResponse:
+    resp = FetchedResponse()
+    resp.url = url
+    resp.status_code = 200
+    resp._content = entry["body"]
+    resp.encoding = entry["encoding"]
+    resp.headers = CaseInsensitiveDict({"Content-Type": entry["content_type"] or ""})
+    resp.from_cache = True
+    return resp
+
+
+def _content_length(resp: requests.Response) -> int:
+    try:
+        return int(resp.headers.get("Content-Length", 0))
+    except ValueError:
+        return 0
+
+
+def _pick_encoding(resp: requests.Response, head: bytes) -> str:
+    content_type = resp.headers.get("Content-Type", "")
+    if "charset=" in content_type.lower():
+        return requests.utils.get_encoding_from_headers(resp.headers)
+    m = _META_CHARSET_RE.search(head)
+    if m:
+        try:
+            return codecs.lookup(m.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+def _read_capped(resp: requests.Response, max_bytes: int, accept: Optional[Tuple[str, ...]]) -> FetchedResponse:
+    """
+    Read a streamed response: reject unwanted Content-Types from the headers alone,
+    stop after max_bytes, and decode chunk by chunk as the body arrives.
+    """
+    content_type = resp.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if accept and content_type and not content_type.startswith(accept):
+        run_stats.incr("fetch_body", "rejected_type")
+        run_stats.incr("fetch_body", "bytes_avoided", _content_length(resp))
+        resp.close()
+        raise BodyRejected(f"{resp.url}: Content-Type {content_type!r} not accepted")
+
+    chunks, pieces, read = [], [], 0
+    decoder = None
+    truncated = False
+    for chunk in resp.iter_content(CHUNK_SIZE):
+        if read + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - read]
+            truncated = True
+        if decoder is None:
+            encoding = _pick_encoding(resp, chunk)
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        chunks.append(chunk)
+        pieces.append(decoder.decode(chunk))
+        read += len(chunk)
+        if truncated:
+            break
+    if decoder is not None and not truncated:
+        pieces.append(decoder.decode(b"", final=True))  # a cut mid-character is simply dropped
+    resp.close()
+
+    run_stats.incr("fetch_body", "bytes_read", read)
+    if truncated:
+        run_stats.incr("fetch_body", "truncated")
+        run_stats.incr("fetch_body", "bytes_avoided", max(_content_length(resp) - read, 0))
+
+    out = FetchedResponse()
+    out.__dict__.update({k: v for k, v in resp.__dict__.items() if k not in ("_content", "raw")})
+    out._content = b"".join(chunks)
+    out._content_consumed = True
+    out.encoding = encoding if decoder is not None else "utf-8"
+    out._decoded = "".join(pieces)
+    out.truncated = truncated
+    return out
+
+
+def http_get(
+    url: str,
+    timeout: int = DEFAULT_TIMEOUT,
+    headers: Optional[Dict[str, str]] = None,
+    use_cache: bool = True,
+    polite: bool = True,
+    accept: Optional[Tuple[str, ...]] = None,
+    max_bytes: int = MAX_BODY_BYTES,
+) -> FetchedResponse:
+    """
+    GET through the pooled session. Raises on network errors like requests.get.
+    The body is streamed: at most max_bytes are read (response.truncated) and, if
+    accept is given, other Content-Types raise BodyRejected before the body is read.
+    With polite, waits for the host's politeness slot first (RobotsDisallowed if
+    robots.txt forbids the URL).
+    With use_cache, the request is made conditional on the cached copy and a 304
+    is turned into a 200 carrying the cached body (response.from_cache = True).
+    Raises host_health.HostUnavailable without sending anything while the host's
+    circuit is open; every outcome is recorded in the host's health.
+    """
+    health = get_host_health()
+    health.check(url)
+    if polite:
+        get_scheduler().wait(url)
+    health.before_request(url)
+
+    # From here until an outcome is recorded the host may be holding its half-open
+    # probe for us; any exception must record a failure or give the probe back.
+    try:
+        cache = get_http_cache() if use_cache else None
+        entry = cache.lookup(url) if cache else None
+        if entry:
+            headers = {**(headers or {}), **cache.conditional_headers(entry)}
+        raw = get_session().get(url, timeout=timeout, headers=headers, stream=True)
+    except requests.exceptions.RequestException as e:
+        health.record(url, error=e)
+        raise
+    except BaseException:
+        health.release(url)
+        raise
+    health.record(url, raw.status_code, retry_after=parse_retry_after(raw.headers.get("Retry-After")))
+    if cache and raw.status_code == 304 and entry:
+        raw.close()
+        run_stats.incr("http_cache", "hit_304")
+        cache.touch(url)
+        return _response_from_cache(url, entry)
+
+    resp = _read_capped(raw, max_bytes, accept)
+    if not cache:
+        return resp
+
+    run_stats.incr("http_cache", "changed" if entry else "miss")
+    if resp.status_code == 200 and not resp.truncated:
+        cache.store(url, resp.headers, resp.content, resp.encoding)
+    return resp
+
+
+def is_unchanged(url: str, timeout: int = DEFAULT_TIMEOUT) -> bool:
+    """True when the server confirms (304) our cached copy of url is current."""
+    try:
+        return http_get(url, timeout=timeout).from_cache
+    except Exception:
+        return False
+
+
+def _host(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+async def _fetch_one(url: str, timeout: int, accept, global_sem: asyncio.Semaphore, host_sems: Dict[str, asyncio.Semaphore]) -> str:
+    # Host slot and politeness delay first, so a throttled host never holds a global slot
+    async with host_sems[_host(url)]:
+        try:
+            get_host_health().check(url)   # fail fast before waiting for a politeness slot
+            await get_scheduler().wait_async(url)
+            async with global_sem:
+                resp = await asyncio.to_thread(http_get, url, timeout, polite=False, accept=accept)
+            return resp.text
+        except Exception as e:
+            print(f"[⚠️] Failed to fetch {url}: {e}")
+            return ""
+
+
+async def fetch_many_async(
+    urls: Iterable[str],
+    timeout: int = DEFAULT_TIMEOUT,
+    max_concurrency: int = MAX_CONCURRENCY,
+    max_per_host: int = MAX_PER_HOST,
+    accept: Optional[Tuple[str, ...]] = HTML_CONTENT_TYPES,
+) -> Dict[str, str]:
+    """
+    Fetch all URLs concurrently, bounded globally and per host.
+    Returns {url: body}; failed and rejected (non-HTML) fetches map to "".
+    """
+    urls = interleave_by_host(dict.fromkeys(urls))
+    global_sem = asyncio.Semaphore(max_concurrency)
+    host_sems: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(max_per_host))
+    results: Dict[str, str] = {}
+
+    async def run(url):
+        body = await _fetch_one(url, timeout, accept, global_sem, host_sems)
+        results[url] = body
+
+    await asyncio.gather(*(run(u) for u in urls))
+    return results
+
+
+def fetch_many(urls: Iterable[str], **kwargs) -> Dict[str, str]:
+    """Sync entry point for fetch_many_async (used from Streamlit / crawl.py)."""
+    return asyncio.run(fetch_many_async(urls, **kwargs))
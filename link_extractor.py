@@ -0,0 +1,145 @@
+# link_extractor.py
+#
+# Single-pass anchor scan shared by every listing-page scraper. Only <a> tags are
+# looked at; article hrefs are matched with precompiled patterns and the "next
+# page" link is found in the same pass. Uses lxml when installed, otherwise a
+# stdlib HTMLParser tokenizer that ignores everything but anchors.
+
+import re
+from html.parser import HTMLParser
+from typing import List, NamedTuple, Optional, Pattern
+from urllib.parse import urljoin, urlparse
+
+from url_classifier import get_url_classifier
+
+try:
+    import lxml.html as _lxml_html
+except ImportError:  # pragma: no cover - depends on environment
+    _lxml_html = None
+
+ARTICLE_HREF_RE   = re.compile(r"(20\d{2}|article|news|robot)", re.I)
+DATED_PERMALINK_RE = re.compile(r"/20\d{2}/\d{2}/\d{2}/")
+PAGINATION_TEXT_RE = re.compile(r"next|more|>|»", re.I)
+NEXT_SYMBOLS       = {">", "»"}
+
+
+class LinkScan(NamedTuple):
+    links: List[str]             # matching article URLs (absolute, de-duplicated, in page order)
+    next_url: Optional[str]      # absolute URL of the "next page" link, if any
+    has_pagination_hint: bool    # some anchor text looks like next/more/»
+
+
+def _is_next(text: str, rel: str) -> bool:
+    return "next" in text or text in NEXT_SYMBOLS or rel.split() == ["next"]
+
+
+class _AnchorTokenizer(HTMLParser):
+    """Collects (href, rel, text) for every <a href> without building a tree."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.anchors = []
+        self._current = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        attrs = dict(attrs)
+        href = attrs.get("href")
+        if href is None:
+            self._current = None
+            return
+        self._current = [href, attrs.get("rel") or "", []]
+        self.anchors.append(self._current)
+
+    def handle_endtag(self, tag):
+        if tag == "a":
+            self._current = None
+
+    def handle_data(self, data):
+        if self._current is not None:
+            self._current[2].append(data)
+
+
+def _iter_anchors(html: str):
+    """Yield (href, rel, stripped lower-case text) for each <a href>."""
+    if _lxml_html is not None:
+        try:
+            root = _lxml_html.fromstring(html)
+        except Exception:
+            root = None
+        if root is not None:
+            for a in root.iter("a"):
+                href = a.get("href")
+                if href is not None:
+                    yield href, a.get("rel") or "", a.text_content().strip().lower()
+            return
+
+    tokenizer = _AnchorTokenizer()
+    tokenizer.feed(html)
+    tokenizer.close()
+    for href, rel, text in tokenizer.anchors:
+        yield href, rel, "".join(text).strip().lower()
+
+
+def extract_links(
+    html: str,
+    base_url: str,
+    pattern: Pattern = ARTICLE_HREF_RE,
+    match_absolute: bool = True,
+    same_host_only: bool = False,
+    drop_query: bool = False,
+    normalize=None,
+    classify: bool = False,
+) -> LinkScan:
+    """
+    Scan html once and return the article links, the next-page link and whether
+    any anchor looks like pagination.
+
+    pattern is matched against the absolute URL (match_absolute) or the raw href.
+    normalize, if given, is applied to every matched absolute URL.
+    classify additionally drops links url_classifier rejects, using the anchor
+    text and the anchor's relative position in the page.
+    """
+    links, seen = [], set()
+    next_url = None
+    hint = False
+    base_host = urlparse(base_url).netloc.lower()
+    anchor_info = {}     # link -> (anchor text, anchor index), for classify
+    total = 0
+
+    for index, (href, rel, text) in enumerate(_iter_anchors(html or "")):
+        total = index + 1
+        href = href.strip()
+        if not href:
+            continue
+        if drop_query:
+            href = href.split("?")[0]
+        absolute = urljoin(base_url, href)
+
+        if not hint and PAGINATION_TEXT_RE.search(text):
+            hint = True
+        if next_url is None and _is_next(text, rel):
+            next_url = absolute
+
+        if not pattern.search(absolute if match_absolute else href):
+            continue
+        if same_host_only and urlparse(absolute).netloc.lower() != base_host:
+            continue
+        if normalize:
+            absolute = normalize(absolute)
+        if absolute not in seen:
+            seen.add(absolute)
+            links.append(absolute)
+            anchor_info[absolute] = (text, index)
+        elif classify and len(text) > len(anchor_info[absolute][0]):
+            anchor_info[absolute] = (text, anchor_info[absolute][1])   # prefer the headline anchor
+
+    if classify:
+        classifier = get_url_classifier()
+        links = [
+            link for link in links
+            if classifier.is_article(link, anchor_info[link][0], anchor_info[link][1] / max(total - 1, 1))
+        ]
+
+    return LinkScan(links, next_url, hint)
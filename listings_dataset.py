@@ -0,0 +1,171 @@
+# listings_dataset.py
+#
+# Append-only Parquet dataset of extracted listings, hive-partitioned as
+#   <LISTINGS_DIR>/run_date=YYYY-MM-DD/domain=<host>/part-<run_id>.parquet
+# Every scrape_urls run appends its listings as new files (nothing is rewritten),
+# with typed columns: relevancy_score is numeric and the article / launch dates
+# are parsed into date columns (the original text is kept alongside).
+# read_listings() filters on the partitions and on row-group statistics, so a
+# date range or a handful of domains only opens the files it needs.
+
+import json
+import os
+import re
+import uuid
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from assets import CACHE_DIR
+from frontier import get_frontier
+from strategy_profile import domain_of
+
+LISTINGS_DIR = os.getenv("LISTINGS_DATASET_DIR", os.path.join(CACHE_DIR, "listings"))
+
+# Listing field (normalized key) -> column type; dates get a *_text twin with the raw value
+_TEXT_FIELDS = (
+    "company", "company_info", "region", "focus", "company_size", "raised_funding",
+    "recent_developments", "partnerships", "media_mentions", "humanoid_robotics_use_case",
+    "single_use_cases", "task_streamlining", "correlation_reason", "article_name",
+    "article_summary", "article_url",
+)
+_DATE_FIELDS = ("article_date", "project_launch_date")
+
+SCHEMA = pa.schema(
+    [(name, pa.string()) for name in _TEXT_FIELDS]
+    + [("relevancy_score", pa.float32())]
+    + [col for name in _DATE_FIELDS for col in ((name, pa.date32()), (f"{name}_text", pa.string()))]
+    + [
+        ("unique_name", pa.string()),
+        ("duplicate_of", pa.string()),
+        ("model", pa.string()),
+        ("run_id", pa.string()),
+        ("extracted_at", pa.timestamp("ms", tz="UTC")),
+        ("extra", pa.string()),          # JSON of any listing fields not in the schema
+    ]
+)
+PARTITION_SCHEMA = pa.schema([("run_date", pa.date32()), ("domain", pa.string())])
+DATASET_SCHEMA   = pa.unify_schemas([SCHEMA, PARTITION_SCHEMA])
+
+_DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%B %d, %Y", "%b %d, %Y", "%d %B %Y", "%d %b %Y",
+                 "%B %Y", "%b %Y", "%Y-%m", "%Y")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+def _field_key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", str(name).strip().lower()).strip("_")
+
+
+def parse_listing_date(value) -> Optional[date]:
+    """A date from the free-form values the LLM returns ("March 5, 2025", "2025-03", ...); None for TBD etc."""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = re.sub(r"(\d)(st|nd|rd|th)\b", r"\1", value.strip())
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).date()
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).date()
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_relevancy_score(value) -> Optional[float]:
+    """The first number in "8", "8/10", "Score: 7.5"; None when there is none."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER_RE.search(value) if isinstance(value, str) else None
+    return float(match.group()) if match else None
+
+
+def listing_record(listing: Dict, unique_name: str, model: str, run_id: str, extracted_at: datetime,
+                   duplicate_of: Optional[str] = None) -> Dict:
+    """One typed dataset row from an enriched listing dict."""
+    fields = {_field_key(k): v for k, v in listing.items()}
+    record = {name: None if fields.get(name) is None else str(fields.pop(name)) for name in _TEXT_FIELDS}
+    record["relevancy_score"] = parse_relevancy_score(fields.pop("relevancy_score", None))
+    for name in _DATE_FIELDS:
+        text = fields.pop(name, None)
+        record[name] = parse_listing_date(text)
+        record[f"{name}_text"] = None if text is None else str(text)
+    record.update(
+        unique_name=unique_name, duplicate_of=duplicate_of, model=model, run_id=run_id, extracted_at=extracted_at,
+        extra=json.dumps(fields, default=str) if fields else None,
+    )
+    return record
+
+
+def append_listings(parsed_results: Iterable[Dict], model: str = "", root: str = LISTINGS_DIR,
+                    run_date: Optional[date] = None) -> List[str]:
+    """
+    Append the listings of scrape_urls' parsed_results to the dataset, one file per
+    source domain (of the crawled page, else of the listing's Article URL) under
+    today's run_date partition. Returns the files written.
+    """
+    run_id = uuid.uuid4().hex[:12]
+    extracted_at = datetime.now(timezone.utc)
+    run_date = run_date or extracted_at.date()
+
+    by_domain: Dict[str, List[Dict]] = {}
+    for result in parsed_results:
+        if result.get("status") != "success":
+            continue
+        for listing in (result.get("parsed_data") or {}).get("listings", []):
+            record = listing_record(listing, result["unique_name"], model, run_id, extracted_at,
+                                    result.get("duplicate_of"))
+            source = get_frontier().url_for(result["unique_name"]) or record["article_url"] or ""
+            domain = domain_of(source) or "unknown"
+            by_domain.setdefault(domain, []).append(record)
+
+    written = []
+    for domain, records in by_domain.items():
+        directory = os.path.join(root, f"run_date={run_date.isoformat()}", f"domain={domain}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{run_id}.parquet")
+        pq.write_table(pa.Table.from_pylist(records, schema=SCHEMA), path, compression="zstd")
+        written.append(path)
+    if written:
+        print(f"[Dataset] Appended {sum(len(r) for r in by_domain.values())} listings "
+              f"for {len(by_domain)} domains to {root}")
+    return written
+
+
+def read_listings(columns: Optional[Sequence[str]] = None, start: Optional[date] = None, end: Optional[date] = None,
+                  domains: Optional[Iterable[str]] = None, min_score: Optional[float] = None,
+                  run_id: Optional[str] = None, root: str = LISTINGS_DIR) -> pa.Table:
+    """
+    Listings between run dates start..end (inclusive) for the given domains, as an
+    Arrow table (.to_pandas() for a DataFrame). The date and domain filters prune
+    partitions; min_score and run_id are pushed down to the Parquet row groups.
+    """
+    columns = list(columns) if columns else None
+    if not os.path.isdir(root):
+        empty = DATASET_SCHEMA.empty_table()
+        return empty.select(columns) if columns else empty
+    dataset = ds.dataset(root, format="parquet", schema=DATASET_SCHEMA,
+                         partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"))
+    conditions = []
+    if start is not None:
+        conditions.append(ds.field("run_date") >= start)
+    if end is not None:
+        conditions.append(ds.field("run_date") <= end)
+    if domains is not None:
+        conditions.append(ds.field("domain").isin(list(domains)))
+    if min_score is not None:
+        conditions.append(ds.field("relevancy_score") >= min_score)
+    if run_id is not None:
+        conditions.append(ds.field("run_id") == run_id)
+    condition = None
+    for c in conditions:
+        condition = c if condition is None else condition & c
+    return dataset.to_table(columns=columns, filter=condition)
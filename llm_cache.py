@@ -0,0 +1,207 @@
+# llm_cache.py
+#
+# Persistent response cache in front of litellm.completion. Every LLM call site
+# imports `completion` from here instead of from litellm; the response is keyed
+# on a hash of (model, messages, params) - the call sites pass seed=42, so a
+# repeated prompt gets the same answer back from disk instead of the API.
+#   - entries expire after LLM_CACHE_TTL seconds (per call: cache_ttl=...)
+#   - the file is kept under MAX_BYTES by evicting least recently used entries
+#   - responses are stored as zlib-compressed JSON unless LLM_CACHE_COMPRESS=0
+# Only complete replies (finish_reason "stop") are stored. A caller that cannot
+# use a reply drops it with invalidate() and asks again with cache=False.
+# LLM_CACHE=0 turns the cache off; streamed calls are never cached.
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional
+
+import litellm
+
+import run_stats
+from assets import CACHE_DIR
+
+CACHE_PATH    = os.path.join(CACHE_DIR, "llm_cache.sqlite")
+ENABLED       = os.getenv("LLM_CACHE", "1") != "0"
+DEFAULT_TTL   = float(os.getenv("LLM_CACHE_TTL", 30 * 24 * 3600))   # seconds
+MAX_BYTES     = 512 * 1024 * 1024
+EVICT_TO      = 0.9             # after eviction the cache is at most this share of MAX_BYTES
+COMPRESS      = os.getenv("LLM_CACHE_COMPRESS", "1") != "0"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key        TEXT PRIMARY KEY,
+    model      TEXT,
+    body       BLOB,
+    compressed INTEGER,
+    size       INTEGER,
+    created_at REAL,
+    expires_at REAL,
+    last_used  REAL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used);
+"""
+
+
+_UNKEYED_PARAMS = ("timeout", "api_key")   # do not change the reply
+
+
+def cache_key(model: str, messages, **params) -> str:
+    params = {k: v for k, v in params.items() if k not in _UNKEYED_PARAMS}
+    payload = json.dumps({"model": model, "messages": messages, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = MAX_BYTES, compress: bool = COMPRESS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._conn = None
+        self._bytes = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        return self._conn
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT body, compressed, size, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                run_stats.incr("llm_cache", "misses")
+                return None
+            body, compressed, size, expires_at = row
+            if expires_at is not None and expires_at < now:
+                db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                db.commit()
+                self._bytes -= size
+                run_stats.incr("llm_cache", "expired")
+                run_stats.incr("llm_cache", "misses")
+                return None
+            db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            db.commit()
+        run_stats.incr("llm_cache", "hits")
+        return json.loads(zlib.decompress(body) if compressed else body)
+
+    def put(self, key: str, model: str, response: dict, ttl: Optional[float] = None):
+        body = json.dumps(response, default=str).encode("utf-8")
+        if self.compress:
+            body = zlib.compress(body, 6)
+        now = time.time()
+        ttl = DEFAULT_TTL if ttl is None else ttl
+        with self._lock:
+            db = self._db()
+            old = db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                """INSERT OR REPLACE INTO responses (key, model, body, compressed, size, created_at, expires_at, last_used)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (key, model, body, int(self.compress), len(body), now, now + ttl if ttl > 0 else None, now),
+            )
+            self._bytes += len(body) - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict(db)
+            db.commit()
+        run_stats.incr("llm_cache", "stores")
+
+    def _evict(self, db: sqlite3.Connection):
+        """Drop expired entries, then least recently used ones, until under EVICT_TO of max_bytes."""
+        self._bytes -= db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses WHERE expires_at < ?", (time.time(),)
+        ).fetchone()[0]
+        db.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+        target, evicted = self.max_bytes * EVICT_TO, []
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            if self._bytes <= target:
+                break
+            evicted.append((key,))
+            self._bytes -= size
+        db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        run_stats.incr("llm_cache", "evicted", len(evicted))
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return False
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            db.commit()
+            self._bytes -= row[0]
+        run_stats.incr("llm_cache", "invalidated")
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._db().execute("DELETE FROM responses")
+            self._db().commit()
+            self._bytes = 0
+
+
+def _dump(response) -> dict:
+    return response.model_dump() if hasattr(response, "model_dump") else dict(response)
+
+
+def _finished(response) -> bool:
+    try:
+        return response.choices[0].finish_reason == "stop"
+    except (AttributeError, IndexError):
+        return False
+
+
+def completion(model: str, messages, cache: bool = True, cache_ttl: Optional[float] = None, **params):
+    """
+    Drop-in for litellm.completion that answers repeated calls from the on-disk
+    cache. cache=False skips the lookup (a fresh reply still replaces the entry);
+    cache_ttl overrides the entry lifetime in seconds, and 0 bypasses the cache.
+    """
+    if not ENABLED or cache_ttl == 0 or params.get("stream"):
+        return litellm.completion(model=model, messages=messages, **params)
+
+    key = cache_key(model, messages, **params)
+    store = get_llm_cache()
+    if cache:
+        cached = store.get(key)
+        if cached is not None:
+            return litellm.ModelResponse(**cached)
+
+    response = litellm.completion(model=model, messages=messages, **params)
+    if not _finished(response):
+        run_stats.incr("llm_cache", "not_stored")
+        return response
+    try:
+        store.put(key, model, _dump(response), cache_ttl)
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        print(f"[LLMCache] Could not store response: {e}")
+    return response
+
+
+def invalidate(model: str, messages, **params) -> bool:
+    """Drop the cached reply of a completion(model, messages, **params) call, e.g. one that did not parse."""
+    if not ENABLED:
+        return False
+    return get_llm_cache().delete(cache_key(model, messages, **params))
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMResponseCache()
+    return _cache
@@ -1,8 +1,9 @@
 # llm_calls.py  – fully updated
 import os, re, json, time, random
-from typing import List, Dict, Any, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List, Dict, Any, Tuple, Callable, Optional
 
-from litellm            import completion            # main call
+from llm_cache          import completion, invalidate    # main call, via the on-disk response cache
 from litellm.exceptions import RateLimitError
 from assets             import MODELS_USED
 from api_management     import get_api_key
@@ -55,6 +56,92 @@ def safe_truncate(txt: str, limit: int) -> str:
 MAX_ARTICLE_CHARS = 12_000       # ≈ 4–5 k tokens
 MAX_ABM_CHARS     =  8_000
 FALLBACK_MODEL    = "gpt-4.1-mini"
+LLM_CONCURRENCY   = int(os.getenv("LLM_CONCURRENCY", "8"))   # articles extracted at once
+LLM_ITEM_TIMEOUT  = 180          # seconds per article, 429 back-off included
+
+def model_api_keys(model: str) -> Dict[str, str]:
+    """
+    {model: key} for model and FALLBACK_MODEL. Resolve this on the Streamlit script
+    thread: get_api_key reads st.session_state, which worker threads cannot see.
+    """
+    return {m: get_api_key(m) or "" for m in (model or "gpt-4o", FALLBACK_MODEL) if m in MODELS_USED}
+
+def _completion_with_retry(
+    model: str,
+    messages: List[Dict[str, str]],
+    MAX_RETRIES: int = 10,
+    BASE_PAUSE:  int = 2,
+    MAX_PAUSE:   int = 30,
+    api_keys: Optional[Dict[str, str]] = None,
+    **params,
+) -> Tuple[Any, str]:
+    chosen = model or "gpt-4o"
+    if api_keys is None:
+        api_keys = model_api_keys(chosen)
+    for attempt in range(MAX_RETRIES):
+        key = {"api_key": api_keys[chosen]} if api_keys.get(chosen) else {}
+        try:
+            return completion(model=chosen, messages=messages, seed=42, **key, **params), chosen
+        except RateLimitError:
+            if attempt == MAX_RETRIES - 1:
+                raise
+            wait_s = min(BASE_PAUSE * 2 ** attempt, MAX_PAUSE) + random.random()
+            print(f"[429] sleeping {wait_s:.1f}s  ({attempt+1}/{MAX_RETRIES})")
+            time.sleep(wait_s)
+            if attempt == 2 and chosen != FALLBACK_MODEL:
+                chosen = FALLBACK_MODEL
+                print("↪︎ switching to fallback model:", chosen)
+
+def completion_with_retry(model: str, messages: List[Dict[str, str]], *retry_args, **params):
+    """
+    completion() with back-off on 429 and a switch to FALLBACK_MODEL after the third;
+    raises the last RateLimitError. Off the script thread pass api_keys=model_api_keys(model).
+    """
+    return _completion_with_retry(model, messages, *retry_args, **params)[0]
+
+class UnparseableReply(ValueError):
+    """The reply did not parse, even when asked for again without the cache; .content is the last reply."""
+    def __init__(self, error: Exception, content: str):
+        super().__init__(str(error))
+        self.content = content
+
+def _reply_text(resp) -> str:
+    try:
+        return resp.choices[0].message.content
+    except (AttributeError, IndexError):
+        return "N/A"
+
+def parsed_completion(
+    model: str,
+    messages: List[Dict[str, str]],
+    parse: Callable[[Any], Any],
+    MAX_RETRIES: int = 10,
+    BASE_PAUSE:  int = 2,
+    MAX_PAUSE:   int = 30,
+    api_keys: Optional[Dict[str, str]] = None,
+    **params,
+) -> Tuple[Any, Any]:
+    """
+    completion_with_retry() followed by parse(resp). A reply that does not parse is
+    dropped from llm_cache and asked for once more, bypassing the cache, so neither
+    this retry nor a later run replays it. Raises UnparseableReply if that fails too.
+    """
+    retry_args = (MAX_RETRIES, BASE_PAUSE, MAX_PAUSE, api_keys if api_keys is not None else model_api_keys(model))
+    resp, chosen = _completion_with_retry(model, messages, *retry_args, **params)
+    for attempt in range(2):
+        try:
+            return resp, parse(resp)
+        except Exception as err:
+            invalidate(chosen, messages, seed=42, **params)
+            if attempt == 1:
+                raise UnparseableReply(err, _reply_text(resp)) from err
+            print(f"[LLM] reply from {chosen} did not parse ({err}); asking again without the cache")
+            resp, chosen = _completion_with_retry(chosen, messages, *retry_args, cache=False, **params)
+
+def _parse_json_reply(resp) -> Dict[str, Any]:
+    raw = resp.choices[0].message.content.strip("` \n")
+    raw = raw[4:].strip() if raw.lower().startswith("json") else raw
+    return normalize_keys(json.loads(raw))
 
 def call_llm_model(
     data: str,
@@ -67,10 +154,6 @@ def call_llm_model(
     MAX_PAUSE:   int = 30,
 ) -> Tuple[Any, Dict[str, int], float]:
     """Send a prompt, parse JSON reply, retry on 429."""
-    # choose model + set its key
-    chosen = model or "gpt-4o"
-    os.environ[list(MODELS_USED[chosen])[0]] = get_api_key(chosen) or ""
-
     # clip oversized inputs
     clipped_article = safe_truncate(data, MAX_ARTICLE_CHARS)
     clipped_abm     = safe_truncate(abm_context, MAX_ABM_CHARS) if abm_context else ""
@@ -83,107 +166,132 @@ def call_llm_model(
     if clipped_abm:
         messages.insert(1, {"role": "system", "content": f"ABM Context:\n{clipped_abm}"})
 
-    for attempt in range(MAX_RETRIES):
-        try:
-            resp = completion(model=chosen, messages=messages, seed=42)
-
-            raw = resp.choices[0].message.content.strip("` \n")
-            raw = raw[4:].strip() if raw.lower().startswith("json") else raw
-
-            normal = normalize_keys(json.loads(raw))
-
-            # post‑process listings
-            needed = [
-                "company", "company_info", "focus", "region", "company_size",
-                "raised_funding", "recent_developments", "partnerships",
-                "media_mentions", "humanoid_robotics_use_case",
-                "single_use_cases", "task_streamlining", "project_launch_date",
-                "relevancy_score", "correlation_reason", "article_name",
-                "article_summary", "article_date", "article_url"
-            ]
-            if "listings" in normal:
-                for lst in normal["listings"]:
-                    lst.pop("source", None)
-                    if lst.get("article_url"):
-                        lst["article_url"] = clean_url_field(fix_url(lst["article_url"]))
-                    for k in needed:
-                        lst.setdefault(k, "")
-                    lst.setdefault("article_summary", normal.get("article_summary", ""))
-
-            final = response_format.model_validate(normal) if response_format else normal
-            usage = resp.usage or {}
-            return final, {
-                "input_tokens":  usage.get("prompt_tokens",     0),
-                "output_tokens": usage.get("completion_tokens", 0)
-            }, 0.0
-
-        except RateLimitError as err:
-            wait = min(BASE_PAUSE * 2 ** attempt, MAX_PAUSE) + random.random()
-            print(f"[429] sleeping {wait:.1f}s  ({attempt+1}/{MAX_RETRIES})")
-            time.sleep(wait)
-            if attempt == 2 and chosen != FALLBACK_MODEL:
-                chosen = FALLBACK_MODEL
-                print("↪︎ switching to fallback model:", chosen)
-                os.environ[list(MODELS_USED[chosen])[0]] = get_api_key(chosen) or ""
-            continue
-        except Exception as err:
-            bad = resp.choices[0].message.content if "resp" in locals() else "N/A"
-            print("🛑 LLM / JSON error:", err)
-            return {"raw_text": bad}, {"input_tokens": 0, "output_tokens": 0}, 0.0
-
-    return (
-        {"raw_text": "LLM call failed after repeated 429s."},
-        {"input_tokens": 0, "output_tokens": 0},
-        0.0
-    )
+    resp = None
+    try:
+        resp, normal = parsed_completion(model, messages, _parse_json_reply, MAX_RETRIES, BASE_PAUSE, MAX_PAUSE)
+
+        # post‑process listings
+        needed = [
+            "company", "company_info", "focus", "region", "company_size",
+            "raised_funding", "recent_developments", "partnerships",
+            "media_mentions", "humanoid_robotics_use_case",
+            "single_use_cases", "task_streamlining", "project_launch_date",
+            "relevancy_score", "correlation_reason", "article_name",
+            "article_summary", "article_date", "article_url"
+        ]
+        if "listings" in normal:
+            for lst in normal["listings"]:
+                lst.pop("source", None)
+                if lst.get("article_url"):
+                    lst["article_url"] = clean_url_field(fix_url(lst["article_url"]))
+                for k in needed:
+                    lst.setdefault(k, "")
+                lst.setdefault("article_summary", normal.get("article_summary", ""))
+
+        final = response_format.model_validate(normal) if response_format else normal
+        usage = resp.usage or {}
+        return final, {
+            "input_tokens":  usage.get("prompt_tokens",     0),
+            "output_tokens": usage.get("completion_tokens", 0)
+        }, 0.0
+
+    except RateLimitError:
+        return (
+            {"raw_text": "LLM call failed after repeated 429s."},
+            {"input_tokens": 0, "output_tokens": 0},
+            0.0
+        )
+    except UnparseableReply as err:
+        print("🛑 LLM / JSON error:", err)
+        return {"raw_text": err.content}, {"input_tokens": 0, "output_tokens": 0}, 0.0
+    except Exception as err:
+        bad = _reply_text(resp) if resp is not None else "N/A"
+        print("🛑 LLM / JSON error:", err)
+        return {"raw_text": bad}, {"input_tokens": 0, "output_tokens": 0}, 0.0
 
 # ════════════════════════════════════════════════════════════════════════
-# small caching helpers
+# one-off summary (repeats are answered by llm_cache)
 # ════════════════════════════════════════════════════════════════════════
-scraped_cache: Dict[str, str] = {}
-
 def summarize_article(article_url: str, article_text: str) -> str:
-    if article_url in scraped_cache:
-        return scraped_cache[article_url]
-
     msgs = [
         {"role": "system", "content": "Summarize this robotics article in 1–2 sentences."},
         {"role": "user",   "content": article_text}
     ]
     try:
-        from openai import ChatCompletion
-        summary = ChatCompletion.create(
-            model="gpt-4o", messages=msgs, temperature=0.0, seed=42
-        )["choices"][0]["message"]["content"]
+        return completion_with_retry("gpt-4o", msgs, temperature=0.0).choices[0].message.content
     except Exception as e:
         print("[summarize_article] error:", e)
-        summary = "Summary unavailable."
-
-    scraped_cache[article_url] = summary
-    return summary
+        return "Summary unavailable."
 
 # ════════════════════════════════════════════════════════════════════════
-# simple parallel summariser (unchanged)
+# concurrent summariser
 # ════════════════════════════════════════════════════════════════════════
+FAILED_SUMMARY = {"listings": [], "article_summary": "Failed"}
+
+def _summarize_one(md: str, model: str, prompt: str, abm_context: str, timeout: float,
+                   api_keys: Dict[str, str]) -> Dict[str, Any]:
+    messages = [
+        {"role": "system", "content": prompt},
+        {"role": "user",   "content": md}
+    ]
+    if abm_context:
+        messages.insert(1, {"role": "system", "content": f"ABM Context:\n{safe_truncate(abm_context, MAX_ABM_CHARS)}"})
+    _, parsed = parsed_completion(
+        model,
+        messages,
+        lambda r: json.loads(r.choices[0].message.content.strip("```json\n").strip("```")),
+        api_keys=api_keys,
+        timeout=timeout,
+    )
+    return parsed
+
 def summarize_articles_parallel(
     markdowns: List[str],
     model: str,
     prompt: str,
-    abm_context: str
+    abm_context: str,
+    max_workers: int = LLM_CONCURRENCY,
+    item_timeout: float = LLM_ITEM_TIMEOUT,
+    on_progress: Optional[Callable[[int, Dict[str, Any], int, int], None]] = None,
 ) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-    for md in markdowns:
-        try:
-            r = completion(
-                model=model,
-                messages=[
-                    {"role": "system", "content": prompt},
-                    {"role": "user",   "content": md}
-                ]
-            )
-            content = r.choices[0].message.content
-            out.append(json.loads(content.strip("```json\n").strip("```")))
-        except Exception as e:
-            print("[summarize_articles_parallel] error:", e)
-            out.append({"listings": [], "article_summary": "Failed"})
+    """
+    Extract every markdown on a pool of max_workers threads, with abm_context
+    (clipped to MAX_ABM_CHARS) sent as a system message. Results keep input
+    order; an article that errors or runs past item_timeout gets FAILED_SUMMARY
+    without affecting the others. on_progress(index, result, completed, total)
+    runs on the calling thread as each article finishes.
+    """
+    out: List[Dict[str, Any]] = [None] * len(markdowns)
+    started: Dict[int, float] = {}
+    api_keys = model_api_keys(model)     # here: the workers cannot read st.session_state
+
+    def run(i: int, md: str) -> Dict[str, Any]:
+        started[i] = time.monotonic()
+        return _summarize_one(md, model, prompt, abm_context, item_timeout, api_keys)
+
+    def finish(i: int, result: Dict[str, Any]):
+        out[i] = result
+        if on_progress:
+            on_progress(i, result, sum(r is not None for r in out), len(out))
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="llm")
+    futures = {pool.submit(run, i, md): i for i, md in enumerate(markdowns)}
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+            for f in done:
+                try:
+                    finish(futures[f], f.result())
+                except Exception as e:
+                    print(f"[summarize_articles_parallel] error on article {futures[f]}:", e)
+                    finish(futures[f], dict(FAILED_SUMMARY))
+            # A hung call keeps its thread, but the article is given up on
+            now = time.monotonic()
+            for f in [f for f in pending if now - started.get(futures[f], now) > item_timeout]:
+                pending.discard(f)
+                print(f"[summarize_articles_parallel] article {futures[f]} timed out after {item_timeout}s")
+                finish(futures[f], dict(FAILED_SUMMARY))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
     return out
@@ -1,88 +1,110 @@
 import asyncio
 import hashlib
-from typing import List
-from api_management import get_supabase_client
+import random
+from typing import Callable, Dict, List, Optional
 from crawl4ai import AsyncWebCrawler
-from markdown_io import save_raw_data
+from markdown_io import raw_data_row, save_raw_data_many
 from pagination import paginate_urls
+from storage import get_storage
+from url_utils import normalize_url
 
-supabase = get_supabase_client()
+MAX_CONCURRENT_CRAWLS = 5
+MAX_RETRIES           = 3
+BASE_BACKOFF          = 1.0   # seconds, doubled per attempt
+MAX_BACKOFF           = 20.0
+
+async def _crawl_with_retry(crawler, url: str, sem: asyncio.Semaphore, retries: int) -> str:
+    for attempt in range(retries):
+        try:
+            async with sem:
+                result = await crawler.arun(url=url)
+            if result.success:
+                return result.markdown or ""
+            error = getattr(result, "error_message", "crawl failed")
+        except Exception as e:
+            error = e
+        if attempt + 1 < retries:
+            wait = min(BASE_BACKOFF * 2 ** attempt, MAX_BACKOFF) + random.random()
+            print(f"[Retry] Attempt {attempt+1} failed for {url}: {error} (retrying in {wait:.1f}s)")
+            await asyncio.sleep(wait)
+        else:
+            print(f"[Retry] Giving up on {url} after {retries} attempts: {error}")
+    return ""
+
+async def fetch_fit_markdowns_async(
+    urls: List[str],
+    on_result: Optional[Callable[[str, str], None]] = None,
+    max_concurrency: int = MAX_CONCURRENT_CRAWLS,
+    retries: int = MAX_RETRIES,
+) -> Dict[str, str]:
+    """
+    Crawl many URLs with a single AsyncWebCrawler (one browser), at most
+    max_concurrency at a time. on_result(url, markdown) is called, off the
+    event loop, as each URL finishes so results can be stored immediately.
+    """
+    results: Dict[str, str] = {}
+    sem = asyncio.Semaphore(max_concurrency)
 
-async def get_fit_markdown_async(url: str) -> str:
     async with AsyncWebCrawler() as crawler:
-        result = await crawler.arun(url=url)
-        return result.markdown if result.success else ""
+        async def run(url):
+            md = await _crawl_with_retry(crawler, url, sem, retries)
+            results[url] = md
+            if on_result:
+                await asyncio.to_thread(on_result, url, md)
 
-def fetch_fit_markdown(url: str) -> str:
+        await asyncio.gather(*(run(u) for u in dict.fromkeys(urls)))
+    return results
+
+def fetch_fit_markdowns(urls: List[str], on_result=None, **kwargs) -> Dict[str, str]:
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     try:
-        return loop.run_until_complete(get_fit_markdown_async(url))
+        return loop.run_until_complete(fetch_fit_markdowns_async(urls, on_result, **kwargs))
     finally:
         loop.close()
 
-def fetch_and_store_markdowns(urls: List[str], selected_model="gpt-4o", abm_context="") -> List[str]:
-    unique_names = []
-    url_name_map = {}
-
-    def normalize_url(url: str) -> str:
-        return url.split("#")[0].rstrip("/")
-
-    # Step 1: Fetch initial markdowns and store
-    for url in urls:
-        url = normalize_url(url)
-        try:
-            raw_md = fetch_fit_markdown(url)
-            hash_part = hashlib.md5(url.encode()).hexdigest()[:8]
-            unique_name = f"{url}_{hash_part}"
+def fetch_fit_markdown(url: str) -> str:
+    return fetch_fit_markdowns([url]).get(url, "")
 
-            if not raw_md.strip():
-                print(f"[WARN] Empty markdown for {url}, skipping.")
-                continue
+def _markdown_unique_name(url: str) -> str:
+    return f"{url}_{hashlib.md5(url.encode()).hexdigest()[:8]}"
 
+def _fetch_and_store_batch(urls: List[str], label: str) -> List[str]:
+    """Fetch a batch and queue every non-empty markdown as soon as it arrives."""
+    rows = {}
+    backend = get_storage()     # collect runs on worker threads, which cannot see st.session_state
 
-            save_raw_data(unique_name, url, raw_md)
-            print(f"[DEBUG] Saved raw_data for {url} as {unique_name}")
+    def collect(url, md):
+        if not md.strip():
+            print(f"[WARN] Empty markdown for {url}, skipping.")
+            return
+        rows[url] = raw_data_row(_markdown_unique_name(url), url, md)
+        save_raw_data_many([rows[url]], backend=backend)
 
-            unique_names.append(unique_name)
-            url_name_map[unique_name] = url
+    fetch_fit_markdowns(urls, on_result=collect)
+    stored = {url: row["unique_name"] for url, row in rows.items()}
+    print(f"[DEBUG] Queued {label} for {len(stored)} URLs")
+    return [stored[u] for u in dict.fromkeys(urls) if u in stored]
 
-        except Exception as e:
-            print(f"[ERROR] Could not fetch raw markdown for {url}: {e}")
+def fetch_and_store_markdowns(urls: List[str], selected_model="gpt-4o", abm_context="") -> List[str]:
+    # Step 1: Fetch initial markdowns and store
+    seed_urls = list(dict.fromkeys(normalize_url(u) for u in urls))
+    unique_names = _fetch_and_store_batch(seed_urls, "raw_data")
+    url_name_map = {_markdown_unique_name(u): u for u in seed_urls}
 
     # Step 2: Paginate and store each paginated article separately
     _, _, _, pagination_results = paginate_urls(
         unique_names=unique_names,
         model=selected_model,
-        indication="",
-        urls=list(url_name_map.values()),
+        user_hint="",
+        urls=[url_name_map[n] for n in unique_names],
         abm_context=abm_context
     )
 
+    page_urls = []
     for result in pagination_results:
-        page_urls = result.get("pagination_data", {}).get("page_urls", []) if hasattr(result, "pagination_data") else []
-
-        for page_url in page_urls:
-            try:
-                md = fetch_fit_markdown(page_url)
-                page_hash = hashlib.md5(page_url.encode()).hexdigest()[:8]
-                page_unique_name = f"{page_url}_{page_hash}"
-
-                save_raw_data(page_unique_name, url=page_url, raw_data=md)
-                print(f"[DEBUG] Saved paginated data for {page_url} as {page_unique_name}")
-                unique_names.append(page_unique_name)
-
-            except Exception as e:
-                print(f"[markdown] Error fetching page {page_url}: {e}")
+        pag = result.get("pagination_data") or {}
+        page_urls.extend(pag.page_urls if hasattr(pag, "page_urls") else pag.get("page_urls", []))
 
+    unique_names.extend(_fetch_and_store_batch(page_urls, "paginated data"))
     return unique_names
-import time
-
-def fetch_fit_markdown_with_retry(url, retries=2):
-    for attempt in range(retries):
-        try:
-            return fetch_fit_markdown(url)
-        except Exception as e:
-            print(f"[Retry] Attempt {attempt+1} failed for {url}: {e}")
-            time.sleep(1)
-    return ""
@@ -1,21 +1,50 @@
-from api_management import get_supabase_client
-supabase = get_supabase_client()
+from typing import Callable, Dict, Iterable, List, Optional
+
+from storage import StorageBackend, get_storage
+from write_behind import get_write_queue
+
+def raw_data_row(unique_name: str, url: str, raw_data: str, raw_html: str = None) -> Dict:
+    row = {"unique_name": unique_name, "raw_data": raw_data}
+    if url:
+        row["url"] = url
+    if raw_html is not None:
+        row["raw_html"] = raw_html
+    return row
+
+def read_raw_data_many(unique_names: Iterable[str]) -> Dict[str, str]:
+    """
+    raw_data for many unique_names. Writes still waiting in the write-behind
+    queue win; the rest is served from the read-through cache where possible.
+    """
+    names = list(dict.fromkeys(unique_names))
+    found = get_write_queue().pending_values(names, "raw_data")
+    missing = [name for name in names if name not in found]
+    if missing:
+        found.update(get_storage().read_raw_many(missing))
+    return found
 
 def read_raw_data(unique_name: str) -> str:
-    try:
-        response = supabase.table("scraped_data").select("raw_data").eq("unique_name", unique_name).execute()
-        data = response.data
-        return data[0].get("raw_data", "") if data else ""
-    except Exception as e:
-        print(f"[ERROR] read_raw_data failed for {unique_name}: {e}")
-        return ""
-
-def save_raw_data(unique_name: str, url: str, raw_data: str):
-    try:
-        supabase.table("scraped_data").upsert({
-            "unique_name": unique_name,
-            "url": url,
-            "raw_data": raw_data,
-        }).execute()
-    except Exception as e:
-        print(f"[ERROR] save_raw_data failed for {unique_name}: {e}")
+    return read_raw_data_many([unique_name]).get(unique_name, "")
+
+def upsert_rows(rows: List[Dict], label: str = "rows", on_done: Optional[Callable[[str, bool], None]] = None,
+                backend: Optional[StorageBackend] = None):
+    """
+    Queue insert-or-update patches of scraped_data rows on unique_name; each row
+    only touches the columns it has. The write-behind queue (write_behind.py)
+    merges and flushes them in the background; on_done(unique_name, ok) runs
+    once a row is stored or given up on. The backend is resolved here, on the
+    caller's thread, so rows go where this session reads from; callers on a
+    worker thread must pass the backend resolved on the script thread instead.
+    """
+    get_write_queue().put_many(rows, on_done, backend=backend or get_storage())
+
+def save_raw_data_many(rows: List[Dict], backend: Optional[StorageBackend] = None):
+    """Bulk save_raw_data; rows come from raw_data_row()."""
+    upsert_rows(rows, "raw_data", backend=backend)
+
+def save_raw_data(unique_name: str, url: str, raw_data: str, raw_html: str = None):
+    save_raw_data_many([raw_data_row(unique_name, url, raw_data, raw_html)])
+
+def flush_writes(timeout: float = None) -> bool:
+    """Wait until every queued write is stored; False if timeout passed first."""
+    return get_write_queue().flush(timeout)
@@ -1,5 +1,5 @@
-from assets import get_api_key
-from litellm import completion
+from api_management import get_api_key
+from llm_cache import completion
 from litellm.exceptions import RateLimitError
 import os
 
@@ -15,14 +15,15 @@ class MyLLMClient:
             {"role": "user", "content": prompt}
         ]
 
+        # Both models are OpenAI ones and share the key
+        os.environ["OPENAI_API_KEY"] = get_api_key(self.primary_model) or ""
+
         # First try with primary
         try:
-            os.environ["OPENAI_API_KEY"] = get_api_key(self.primary_model)
             response = completion(model=self.primary_model, messages=messages, seed=42)
         except RateLimitError:
             print(f"[⚠️] Rate limit hit for {self.primary_model}, retrying with {self.fallback_model}...")
             self.model = self.fallback_model
-            os.environ["OPENAI_API_KEY"] = get_api_key(self.fallback_model)
             response = completion(model=self.fallback_model, messages=messages, seed=42)
 
         return response.choices[0].message.content.strip()
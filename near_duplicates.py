@@ -0,0 +1,117 @@
+# near_duplicates.py
+#
+# SimHash fingerprints over extracted article text, used to group syndicated
+# copies of the same press release (and AMP / print / tracking-parameter variants
+# of one article) so only one copy per group goes through LLM extraction.
+# Fingerprints are 64-bit SimHashes of word 3-shingles; the index splits them into
+# 4 bands of 16 bits, so any two fingerprints within Hamming distance 3 share a band.
+# Only extracted text is fingerprinted: when extraction fails, crawl stores the raw
+# HTML as raw_data, and one site's boilerplate markup would put unrelated articles
+# within range of each other. Such rows, and texts under MIN_WORDS of body text,
+# always stay singletons.
+
+import hashlib
+import re
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+FINGERPRINT_BITS = 64
+SHINGLE_WORDS    = 3
+MAX_DISTANCE     = 3        # Hamming distance at or below which two texts are near-duplicates
+BANDS            = 4        # MAX_DISTANCE + 1 bands, so a near-duplicate always collides in one
+MIN_WORDS        = 80       # words of body text below which a text never joins a cluster
+
+_WORD_RE   = re.compile(r"\w+", re.UNICODE)
+_HEADER_RE = re.compile(r"^(#\s|By:|Date:|URL:)", re.M)
+_HTML_RE   = re.compile(r"\s*<(!doctype|html|head|body|\?xml|!--)|\s*<[a-z][^>]*>[\s\S]*</(div|p|body|html|span|a)>",
+                        re.I)
+
+
+def looks_like_html(text: str) -> bool:
+    """True for raw_data that is the crawler's raw-HTML fallback rather than extracted text."""
+    return bool(_HTML_RE.match(text[:2000]))
+
+
+def _words(text: str) -> List[str]:
+    # Drop the "# title / By: / Date: / URL:" header content_extraction adds; the URL differs per copy
+    body = "\n".join(line for line in text.splitlines() if not _HEADER_RE.match(line))
+    return _WORD_RE.findall(body.lower())
+
+
+def simhash(text: str) -> Optional[int]:
+    """64-bit SimHash of the text's word shingles, or None for raw HTML or too short a text."""
+    if looks_like_html(text):
+        return None
+    words = _words(text)
+    if len(words) < MIN_WORDS:
+        return None
+    weights = [0] * FINGERPRINT_BITS
+    for i in range(len(words) - SHINGLE_WORDS + 1):
+        shingle = " ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8")
+        h = int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit, w in enumerate(weights) if w > 0)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """Banded lookup of fingerprints within MAX_DISTANCE of a query."""
+
+    def __init__(self, max_distance: int = MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.band_bits = FINGERPRINT_BITS // BANDS
+        self._bands: List[Dict[int, List[Tuple[Hashable, int]]]] = [{} for _ in range(BANDS)]
+
+    def _keys(self, fp: int) -> Iterable[Tuple[int, int]]:
+        mask = (1 << self.band_bits) - 1
+        for band in range(BANDS):
+            yield band, fp >> (band * self.band_bits) & mask
+
+    def add(self, key: Hashable, fp: int):
+        for band, value in self._keys(fp):
+            self._bands[band].setdefault(value, []).append((key, fp))
+
+    def query(self, fp: int) -> List[Hashable]:
+        found = []
+        for band, value in self._keys(fp):
+            for key, other in self._bands[band].get(value, ()):
+                if key not in found and hamming(fp, other) <= self.max_distance:
+                    found.append(key)
+        return found
+
+
+def cluster_near_duplicates(texts: Dict[Hashable, str]) -> List[List[Hashable]]:
+    """
+    Group keys whose texts are near-duplicates. Clusters keep input order; the
+    first key of each is its representative. Raw HTML and texts too short to
+    fingerprint are singletons.
+    """
+    parent = {key: key for key in texts}
+    order = {key: i for i, key in enumerate(texts)}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    index = SimHashIndex()
+    for key, text in texts.items():
+        fp = simhash(text or "")
+        if fp is None:
+            continue
+        for other in index.query(fp):
+            root, other_root = find(key), find(other)
+            if root != other_root:
+                # Keep the earlier key as root so it stays the representative
+                first, second = sorted((root, other_root), key=order.get)
+                parent[second] = first
+        index.add(key, fp)
+
+    clusters: Dict[Hashable, List[Hashable]] = {}
+    for key in texts:
+        clusters.setdefault(find(key), []).append(key)
+    return list(clusters.values())
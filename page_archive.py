@@ -0,0 +1,179 @@
+# page_archive.py
+#
+# Local append-only archive of fetched pages in WARC-style segments
+# (one gzip member per record, so any record can be read alone by offset).
+# A SQLite index maps canonical URL -> content hash -> (segment, offset, length);
+# identical bodies are stored once. Reads go through mmap, so re-running
+# extraction over stored pages is local I/O with no network.
+
+import gzip
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional, Tuple
+
+import run_stats
+from assets import CACHE_DIR
+from url_utils import normalize_url
+
+ARCHIVE_DIR       = os.path.join(CACHE_DIR, "archive")
+INDEX_PATH        = os.path.join(ARCHIVE_DIR, "index.sqlite")
+SEGMENT_MAX_BYTES = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    content_hash TEXT PRIMARY KEY,
+    segment      TEXT NOT NULL,
+    offset       INTEGER NOT NULL,
+    length       INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS urls (
+    canonical_url TEXT PRIMARY KEY,
+    url           TEXT,
+    content_hash  TEXT NOT NULL,
+    fetched_at    REAL
+);
+"""
+
+
+def _warc_record(url: str, body: bytes, digest: str) -> bytes:
+    headers = (
+        "WARC/1.1\r\n"
+        "WARC-Type: resource\r\n"
+        f"WARC-Target-URI: {url}\r\n"
+        f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+        f"WARC-Payload-Digest: sha256:{digest}\r\n"
+        "Content-Type: text/html; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n"
+    )
+    return headers.encode() + body + b"\r\n\r\n"
+
+
+def _parse_record(raw: bytes) -> Tuple[Dict[str, str], bytes]:
+    head, _, rest = raw.partition(b"\r\n\r\n")
+    headers = {}
+    for line in head.decode("utf-8", "replace").split("\r\n")[1:]:
+        key, _, value = line.partition(":")
+        headers[key.strip()] = value.strip()
+    length = int(headers.get("Content-Length", len(rest)))
+    return headers, rest[:length]
+
+
+class PageArchive:
+    def __init__(self, directory: str = ARCHIVE_DIR, index_path: str = INDEX_PATH):
+        self.directory = directory
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._segment: Optional[str] = None     # segment being appended to, and its size
+        self._segment_size = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.index_path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _current_segment(self) -> str:
+        """Segment to append to; the directory is only listed once, then tracked in memory."""
+        if self._segment is None:
+            segments = sorted(f for f in os.listdir(self.directory) if f.endswith(".warc.gz"))
+            self._segment = segments[-1] if segments else "segment-00001.warc.gz"
+            path = os.path.join(self.directory, self._segment)
+            self._segment_size = os.path.getsize(path) if os.path.exists(path) else 0
+        if self._segment_size >= SEGMENT_MAX_BYTES:
+            number = int(self._segment.split("-")[1].split(".")[0]) + 1
+            self._segment, self._segment_size = f"segment-{number:05d}.warc.gz", 0
+        return self._segment
+
+    def put(self, url: str, html: str) -> str:
+        """Archive html for url; returns its content hash. Identical bodies are stored once."""
+        body = html.encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            db = self._db()
+            if db.execute("SELECT 1 FROM records WHERE content_hash = ?", (digest,)).fetchone():
+                run_stats.incr("archive", "deduped")
+            else:
+                member = gzip.compress(_warc_record(url, body, digest))
+                segment = self._current_segment()
+                path = os.path.join(self.directory, segment)
+                with open(path, "ab") as f:
+                    offset = f.tell()
+                    f.write(member)
+                self._segment_size = offset + len(member)
+                stale = self._maps.pop(segment, None)   # file grew; remap on next read
+                if stale is not None:
+                    stale.close()
+                db.execute("INSERT INTO records VALUES (?, ?, ?, ?)", (digest, segment, offset, len(member)))
+                run_stats.incr("archive", "stored")
+                run_stats.incr("archive", "bytes_compressed", len(member))
+            db.execute(
+                "INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?)",
+                (normalize_url(url), url, digest, time.time()),
+            )
+            db.commit()
+        return digest
+
+    def _read(self, segment: str, offset: int, length: int) -> Tuple[Dict[str, str], bytes]:
+        with self._lock:
+            mm = self._maps.get(segment)
+            if mm is None:
+                with open(os.path.join(self.directory, segment), "rb") as f:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[segment] = mm
+            raw = gzip.decompress(mm[offset:offset + length])
+        return _parse_record(raw)
+
+    def get(self, url: str) -> Optional[str]:
+        """Latest archived HTML for url (by canonical form), or None."""
+        with self._lock:
+            row = self._db().execute(
+                """SELECT r.segment, r.offset, r.length FROM urls u
+                   JOIN records r ON r.content_hash = u.content_hash
+                   WHERE u.canonical_url = ?""",
+                (normalize_url(url),),
+            ).fetchone()
+        if not row:
+            return None
+        _, body = self._read(*row)
+        return body.decode("utf-8", "replace")
+
+    def iter_pages(self) -> Iterator[Tuple[str, str]]:
+        """Yield (url, html) for every archived URL in segment/offset order (sequential I/O)."""
+        with self._lock:
+            rows = self._db().execute(
+                """SELECT u.url, r.segment, r.offset, r.length FROM urls u
+                   JOIN records r ON r.content_hash = u.content_hash
+                   ORDER BY r.segment, r.offset"""
+            ).fetchall()
+        for url, segment, offset, length in rows:
+            _, body = self._read(segment, offset, length)
+            yield url, body.decode("utf-8", "replace")
+
+    def close(self):
+        with self._lock:
+            for mm in self._maps.values():
+                mm.close()
+            self._maps.clear()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_archive: Optional[PageArchive] = None
+
+
+def get_archive() -> PageArchive:
+    global _archive
+    if _archive is None:
+        _archive = PageArchive()
+    return _archive
@@ -1,13 +1,10 @@
 import json
 from typing import List, Dict
 from assets import PROMPT_PAGINATION
-from markdown_io import read_raw_data, save_raw_data
-from api_management import get_supabase_client
+from markdown_io import read_raw_data_many, upsert_rows
 from pydantic import BaseModel, create_model
 from llm_calls import call_llm_model
 
-supabase = get_supabase_client()
-
 class PaginationModel(BaseModel):
     page_urls: List[str]
 
@@ -25,7 +22,7 @@ def build_pagination_prompt(indications: str, url: str) -> str:
         prompt += "No special user indications. Apply general pagination logic.\n\n"
     return prompt
 
-def save_pagination_data(unique_name: str, pagination_data):
+def _pagination_payload(pagination_data):
     if hasattr(pagination_data, "dict"):
         pagination_data = pagination_data.dict()
     if isinstance(pagination_data, str):
@@ -33,16 +30,17 @@ def save_pagination_data(unique_name: str, pagination_data):
             pagination_data = json.loads(pagination_data)
         except json.JSONDecodeError:
             pagination_data = {"raw_text": pagination_data}
+    return pagination_data
 
-    # Preserve existing raw_data while updating pagination
-    raw_data = read_raw_data(unique_name)
-    save_raw_data(unique_name, url="", raw_data=raw_data)  # optional, depending on your schema
+def save_pagination_data_many(items: Dict[str, object]):
+    """Queue {unique_name: pagination_data} for the write-behind flusher; other columns of the rows are left as they are."""
+    upsert_rows(
+        [{"unique_name": uniq, "pagination_data": _pagination_payload(data)} for uniq, data in items.items()],
+        "pagination_data",
+    )
 
-    supabase.table("scraped_data").update({
-        "pagination_data": pagination_data
-    }).eq("unique_name", unique_name).execute()
-
-    print(f"\033[35mINFO: Pagination data saved for {unique_name}\033[0m")
+def save_pagination_data(unique_name: str, pagination_data):
+    save_pagination_data_many({unique_name: pagination_data})
 
 def paginate_urls(unique_names: List[str], model: str, user_hint: str, urls: List[str], abm_context: str = ""):
     total_input_tokens = 0
@@ -50,8 +48,9 @@ def paginate_urls(unique_names: List[str], model: str, user_hint: str, urls: Lis
     total_cost = 0
     pagination_results = []
 
+    raw_by_name = read_raw_data_many(unique_names)
     for uniq, current_url in zip(unique_names, urls):
-        raw_data = read_raw_data(uniq)
+        raw_data = raw_by_name.get(uniq, "")
         if not raw_data:
             print(f"[WARN] No raw_data found for {uniq}, skipping pagination.")
             continue
@@ -79,4 +78,5 @@ def paginate_urls(unique_names: List[str], model: str, user_hint: str, urls: Lis
             "pagination_data": pag_data
         })
 
+    print(f"\033[35mINFO: Pagination data queued for {len(pagination_results)} articles\033[0m")
     return total_input_tokens, total_output_tokens, total_cost, pagination_results
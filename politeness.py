@@ -0,0 +1,136 @@
+# politeness.py
+#
+# Per-domain pacing for every fetch: a token bucket per host (rate taken from
+# robots.txt Crawl-delay when present), plus robots.txt allow/deny checks.
+# robots.txt is cached per host with a TTL.
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from typing import Dict, Iterable, List, Tuple
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import run_stats
+
+DEFAULT_RATE   = 2.0            # requests per second per host
+DEFAULT_BURST  = 4
+ROBOTS_TTL     = 24 * 3600      # seconds
+ROBOTS_AGENT   = "*"
+RESPECT_ROBOTS = True
+
+
+class RobotsDisallowed(Exception):
+    pass
+
+
+class _Bucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take one token (possibly going into debt) and return how long to wait for it."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class PolitenessScheduler:
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST, robots_ttl: int = ROBOTS_TTL):
+        self.rate = rate
+        self.burst = burst
+        self.robots_ttl = robots_ttl
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, _Bucket] = {}
+        self._robots: Dict[str, Tuple[RobotFileParser, float]] = {}
+        self._robots_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+
+    # ── robots.txt ─────────────────────────────────────────────────────────
+    def _load_robots(self, origin: str) -> RobotFileParser:
+        from http_client import http_get  # avoid import cycle
+
+        rp = RobotFileParser()
+        try:
+            resp = http_get(f"{origin}/robots.txt", polite=False)
+            rp.parse(resp.text.splitlines() if resp.status_code == 200 else [])
+        except Exception as e:
+            print(f"[Politeness] Could not read robots.txt for {origin}: {e}")
+            rp.parse([])
+        return rp
+
+    def robots_for(self, url: str) -> RobotFileParser:
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+        cached = self._robots.get(host)
+        if cached and time.time() - cached[1] < self.robots_ttl:
+            return cached[0]
+        with self._robots_locks[host]:
+            cached = self._robots.get(host)
+            if cached and time.time() - cached[1] < self.robots_ttl:
+                return cached[0]
+            rp = self._load_robots(f"{parsed.scheme}://{parsed.netloc}")
+            self._robots[host] = (rp, time.time())
+            run_stats.incr("politeness", "robots_fetched")
+            return rp
+
+    def allowed(self, url: str) -> bool:
+        return not RESPECT_ROBOTS or self.robots_for(url).can_fetch(ROBOTS_AGENT, url)
+
+    # ── pacing ─────────────────────────────────────────────────────────────
+    def _reserve(self, url: str) -> float:
+        """Check robots.txt and book a slot in the host's bucket; returns the delay."""
+        if not self.allowed(url):
+            run_stats.incr("politeness", "robots_disallowed")
+            raise RobotsDisallowed(f"robots.txt disallows {url}")
+
+        host = urlparse(url).netloc.lower()
+        crawl_delay = None
+        if host not in self._buckets:
+            crawl_delay = self.robots_for(url).crawl_delay(ROBOTS_AGENT)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = _Bucket(1.0 / float(crawl_delay), 1) if crawl_delay else _Bucket(self.rate, self.burst)
+                self._buckets[host] = bucket
+            wait = bucket.reserve()
+        if wait:
+            run_stats.incr("politeness", "waited_ms", int(wait * 1000))
+        return wait
+
+    def wait(self, url: str):
+        """Block until url may be fetched. Raises RobotsDisallowed."""
+        time.sleep(self._reserve(url))
+
+    async def wait_async(self, url: str):
+        """Async version of wait(); robots.txt is loaded off the event loop."""
+        await asyncio.sleep(await asyncio.to_thread(self._reserve, url))
+
+
+def interleave_by_host(urls: Iterable[str]) -> List[str]:
+    """Round-robin URLs across hosts so no single site is drained first."""
+    queues: "OrderedDict[str, deque]" = OrderedDict()
+    for u in urls:
+        queues.setdefault(urlparse(u).netloc.lower(), deque()).append(u)
+    out = []
+    while queues:
+        for host in list(queues):
+            out.append(queues[host].popleft())
+            if not queues[host]:
+                del queues[host]
+    return out
+
+
+_scheduler = None
+
+
+def get_scheduler() -> PolitenessScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = PolitenessScheduler()
+    return _scheduler
@@ -0,0 +1,74 @@
+# resource_blocking.py
+#
+# Routing policy for Playwright pages: abort requests for heavy resource types
+# and ad/analytics hosts, since the scrapers only read <a href> from page.content().
+
+from typing import Dict, Iterable
+from urllib.parse import urlparse
+
+import run_stats
+from scraping_strategies import RESOURCE_BLOCKING_OVERRIDES
+
+DEFAULT_BLOCKED_TYPES = {"image", "media", "font"}
+
+DEFAULT_BLOCKED_DOMAINS = {
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com",
+    "google-analytics.com", "googletagmanager.com", "googletagservices.com",
+    "adservice.google.com", "amazon-adsystem.com", "adnxs.com", "criteo.com",
+    "taboola.com", "outbrain.com", "scorecardresearch.com", "quantserve.com",
+    "chartbeat.com", "hotjar.com", "segment.io", "newrelic.net",
+    "facebook.net", "connect.facebook.net", "twitter.com", "linkedin.com",
+    "pubmatic.com", "rubiconproject.com", "moatads.com", "hubspot.com",
+}
+
+# Rough transfer sizes used to estimate bytes saved, since aborted requests
+# never report a Content-Length.
+ESTIMATED_BYTES = {
+    "image": 60_000, "media": 500_000, "font": 40_000, "stylesheet": 30_000,
+    "script": 80_000, "xhr": 5_000, "fetch": 5_000, "other": 10_000,
+}
+
+
+def _site(url: str) -> str:
+    return urlparse(url).netloc.lower().replace("www.", "")
+
+
+def _host_matches(host: str, domains: Iterable[str]) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+def get_policy(site_url: str) -> Dict[str, set]:
+    """Default policy merged with the site's entry in RESOURCE_BLOCKING_OVERRIDES."""
+    override = RESOURCE_BLOCKING_OVERRIDES.get(_site(site_url), {})
+    return {
+        "block_types":   set(override.get("block_types", DEFAULT_BLOCKED_TYPES)),
+        "block_domains": DEFAULT_BLOCKED_DOMAINS | set(override.get("block_domains", [])),
+        "allow_domains": set(override.get("allow_domains", [])),
+    }
+
+
+def install_blocking(target, site_url: str):
+    """Attach the routing policy to a Playwright Page or BrowserContext."""
+    policy = get_policy(site_url)
+
+    def handle(route):
+        request = route.request
+        rtype = request.resource_type
+        host = urlparse(request.url).netloc.lower()
+
+        blocked = None
+        if not _host_matches(host, policy["allow_domains"]):
+            if rtype in policy["block_types"]:
+                blocked = f"type:{rtype}"
+            elif _host_matches(host, policy["block_domains"]):
+                blocked = "denylist"
+
+        if blocked:
+            run_stats.incr("blocked_requests", blocked)
+            run_stats.incr("blocked_bytes_est", "total", ESTIMATED_BYTES.get(rtype, ESTIMATED_BYTES["other"]))
+            route.abort()
+        else:
+            run_stats.incr("blocked_requests", "allowed")
+            route.continue_()
+
+    target.route("**/*", handle)
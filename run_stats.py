@@ -0,0 +1,39 @@
+# run_stats.py
+#
+# Per-run counters shared by the fetch/scrape layers. crawl_and_extract resets
+# them at the start of a run and prints a report at the end.
+
+import threading
+from collections import Counter, defaultdict
+from typing import Dict
+
+_lock = threading.Lock()
+_stats: Dict[str, Counter] = defaultdict(Counter)
+
+
+def incr(section: str, key: str, n: int = 1):
+    with _lock:
+        _stats[section][key] += n
+
+
+def maximum(section: str, key: str, value: int):
+    """Keep the largest value seen for a gauge-style key."""
+    with _lock:
+        if value > _stats[section][key]:
+            _stats[section][key] = value
+
+
+def snapshot() -> Dict[str, Dict[str, int]]:
+    with _lock:
+        return {section: dict(counter) for section, counter in _stats.items()}
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def report():
+    for section, counts in sorted(snapshot().items()):
+        line = ", ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+        print(f"[STATS] {section}: {line}")
@@ -1,150 +1,239 @@
-
-
-import logging
-import json
-import re
-from typing import List, Optional
-from urllib.parse import urljoin
-from llm_calls import MAX_ARTICLE_CHARS as MAX_CHARS
-
-from pydantic import BaseModel, create_model, Field
-from bs4 import BeautifulSoup
-
-from llm_calls import summarize_articles_parallel
-from assets import ROBOTICS_SYSTEM_MESSAGE
-from markdown_io import read_raw_data
-from api_management import get_supabase_client
-from utils import enrich_company_metadata, correlate_with_abm, extract_launch_date_from_article
-from abm_docs import get_abm_report_text
-
-# ─── Setup ─────────────────────────────────────────────────────────────────────
-
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-supabase = get_supabase_client()
-
-# ─── Dynamic Pydantic Models ───────────────────────────────────────────────────
-
-def create_dynamic_listing_model(field_names: List[str]):
-    required_fields = [
-        "Company", "Company Info", "Focus", "Region",
-        "Humanoid Robotics Use Case", "Single Use Cases", "Task Streamlining",
-        "Raised Funding", "Recent Developments", "Partnerships",
-        "Relevancy Score", "Correlation Reason",
-        "Article Name", "Article Summary", "Article Date", "Article URL",
-        "Project Launch Date"
-    ]
-    all_fields = list(set(required_fields + field_names))
-    defs = {
-        field: (Optional[str], Field(default=None, alias=field.lower().replace(" ", "_")))
-        for field in all_fields
-    }
-    class Config:
-        populate_by_name = True
-        extra = "allow"
-    return create_model("DynamicListingModel", __config__=Config, **defs)
-
-def create_listings_container_model(listing_model: BaseModel):
-    class Config:
-        populate_by_name = True
-        extra = "allow"
-    return create_model(
-        "DynamicListingsContainer",
-        __config__=Config,
-        listings=(List[listing_model], Field(..., alias="listings"))
-    )
-
-# ─── Helpers ───────────────────────────────────────────────────────────────────
-
-def sanitize_article_url(raw_url: str) -> str:
-    if not raw_url or not isinstance(raw_url, str):
-        return "TBD"
-    m = re.search(r'<(https?://[^>\s]+)>', raw_url)
-    if m:
-        return m.group(1)
-    cleaned = raw_url.strip().split("<")[0].split(">")[-1].strip()
-    return cleaned if cleaned.startswith(("http://", "https://")) else "TBD"
-
-def save_formatted_data(unique_name: str, formatted_data):
-    if isinstance(formatted_data, str):
-        try:
-            data = json.loads(formatted_data)
-        except json.JSONDecodeError:
-            data = {"raw_text": formatted_data}
-    elif hasattr(formatted_data, "dict"):
-        data = formatted_data.dict()
-    else:
-        data = formatted_data
-    supabase.table("scraped_data").update({"formatted_data": data}).eq("unique_name", unique_name).execute()
-    logging.info(f"Saved formatted_data for {unique_name}")
-
-# ─── Main Scraping & Extraction ────────────────────────────────────────────────
-
-def scrape_urls(unique_names: List[str], fields: List[str], selected_model: str, abm_context: str = ""):
-    """
-    For each raw article (in Supabase under unique_name) run LLM extraction:
-    1) Summarize + extract into JSON listings
-    2) Enrich each listing (metadata, ABM correlation, launch date)
-    3) Persist formatted_data back to Supabase
-    Returns token usage & a list of parsed_results.
-    """
-    total_in, total_out, total_cost = 0, 0, 0
-    parsed_results = []
-
-    # Build Pydantic schema
-    DynamicListingModel = create_dynamic_listing_model(fields)
-    DynamicContainer   = create_listings_container_model(DynamicListingModel)
-
-    if not abm_context:
-        abm_context = get_abm_report_text()
-
-    # Read all markdowns
-    markdowns, valid_uniques = [], []
-    for uniq in unique_names:
-        md = read_raw_data(uniq)
-        if md:
-            md = md[:MAX_CHARS]  # truncate here
-            markdowns.append(md)
-            valid_uniques.append(uniq)
-        else:
-            logging.warning(f"No raw_data for {uniq}, skipping.")
-
-    
-
-    # 1) Summarize & JSON‑extract listings in parallel
-    logging.info(f"Extracting {len(markdowns)} articles with model {selected_model}")
-    results = summarize_articles_parallel(markdowns, selected_model, ROBOTICS_SYSTEM_MESSAGE, abm_context)
-
-    # 2) Post‑process each listing
-    for uniq, parsed in zip(valid_uniques, results):
-        try:
-            listings = parsed.get("listings", [])
-            for lst in listings:
-                # a) Enrich company metadata & ABM correlation
-                enrich_company_metadata(lst, selected_model)
-                correlate_with_abm(lst, abm_context, selected_model)
-                # b) Extract launch date if needed
-                if lst.get("Project Launch Date", "TBD") == "TBD":
-                    ld = extract_launch_date_from_article(read_raw_data(uniq), selected_model)
-                    lst["Project Launch Date"] = ld.get("project_launch_date", "TBD")
-                # c) Clean up URL
-                lst["Article URL"] = sanitize_article_url(lst.get("Article URL", ""))
-
-            # 3) Save back to Supabase
-            save_formatted_data(uniq, parsed)
-
-            parsed_results.append({
-                "unique_name": uniq,
-                "parsed_data": parsed,
-                "status": "success"
-            })
-
-        except Exception as e:
-            logging.error(f"Processing failure for {uniq}: {e}")
-            parsed_results.append({
-                "unique_name": uniq,
-                "parsed_data": {},
-                "status": "failed",
-                "error": str(e)
-            })
-
-    return total_in, total_out, total_cost, parsed_results
+
+
+import copy
+import logging
+import json
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+from llm_calls import MAX_ARTICLE_CHARS as MAX_CHARS
+
+from pydantic import BaseModel, create_model, Field
+from bs4 import BeautifulSoup
+
+import run_stats
+
+from llm_calls import summarize_articles_parallel
+from assets import ROBOTICS_SYSTEM_MESSAGE
+from markdown_io import read_raw_data_many, upsert_rows
+from utils import enrich_company_metadata, correlate_with_abm, extract_launch_date_from_article
+from abm_docs import get_abm_report_text
+from frontier import get_frontier
+from near_duplicates import cluster_near_duplicates
+from listings_dataset import append_listings
+from extraction_memo import extraction_cost, get_extraction_memo, record_lookup
+
+# ─── Setup ─────────────────────────────────────────────────────────────────────
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# ─── Dynamic Pydantic Models ───────────────────────────────────────────────────
+
+def create_dynamic_listing_model(field_names: List[str]):
+    required_fields = [
+        "Company", "Company Info", "Focus", "Region",
+        "Humanoid Robotics Use Case", "Single Use Cases", "Task Streamlining",
+        "Raised Funding", "Recent Developments", "Partnerships",
+        "Relevancy Score", "Correlation Reason",
+        "Article Name", "Article Summary", "Article Date", "Article URL",
+        "Project Launch Date"
+    ]
+    all_fields = list(set(required_fields + field_names))
+    defs = {
+        field: (Optional[str], Field(default=None, alias=field.lower().replace(" ", "_")))
+        for field in all_fields
+    }
+    class Config:
+        populate_by_name = True
+        extra = "allow"
+    return create_model("DynamicListingModel", __config__=Config, **defs)
+
+def create_listings_container_model(listing_model: BaseModel):
+    class Config:
+        populate_by_name = True
+        extra = "allow"
+    return create_model(
+        "DynamicListingsContainer",
+        __config__=Config,
+        listings=(List[listing_model], Field(..., alias="listings"))
+    )
+
+# ─── Helpers ───────────────────────────────────────────────────────────────────
+
+def sanitize_article_url(raw_url: str) -> str:
+    if not raw_url or not isinstance(raw_url, str):
+        return "TBD"
+    m = re.search(r'<(https?://[^>\s]+)>', raw_url)
+    if m:
+        return m.group(1)
+    cleaned = raw_url.strip().split("<")[0].split(">")[-1].strip()
+    return cleaned if cleaned.startswith(("http://", "https://")) else "TBD"
+
+def _formatted_payload(formatted_data):
+    if isinstance(formatted_data, str):
+        try:
+            return json.loads(formatted_data)
+        except json.JSONDecodeError:
+            return {"raw_text": formatted_data}
+    if hasattr(formatted_data, "dict"):
+        return formatted_data.dict()
+    return formatted_data
+
+def _is_real_extraction(parsed) -> bool:
+    """False for the placeholders of a failed LLM call (FAILED_SUMMARY, {"raw_text": ...})."""
+    return isinstance(parsed, dict) and "raw_text" not in parsed and parsed.get("article_summary") != "Failed"
+
+def _mark_extracted_when_stored(unique_name: str, ok: bool):
+    if ok:
+        get_frontier().mark_extracted(unique_name)
+    else:
+        logging.error(f"Saving formatted_data failed for {unique_name}")
+
+def save_formatted_data_many(items: Dict[str, object]):
+    """
+    Queue {unique_name: formatted_data} for the write-behind flusher. Real results are
+    marked extracted once stored; failure placeholders are saved but left unmarked,
+    so the article is retried on the next run.
+    """
+    rows = {uniq: {"unique_name": uniq, "formatted_data": _formatted_payload(data)} for uniq, data in items.items()}
+    real = [uniq for uniq in rows if _is_real_extraction(rows[uniq]["formatted_data"])]
+    upsert_rows([rows[uniq] for uniq in real], "formatted_data", on_done=_mark_extracted_when_stored)
+    upsert_rows([row for uniq, row in rows.items() if uniq not in real], "formatted_data")
+
+def save_formatted_data(unique_name: str, formatted_data):
+    save_formatted_data_many({unique_name: formatted_data})
+
+# ─── Main Scraping & Extraction ────────────────────────────────────────────────
+
+def scrape_urls(unique_names: List[str], fields: List[str], selected_model: str, abm_context: str = "",
+                on_progress=None):
+    """
+    For each raw article (in Supabase under unique_name) run LLM extraction:
+    1) Summarize + extract into JSON listings
+    2) Enrich each listing (metadata, ABM correlation, launch date)
+    3) Queue formatted_data for the write-behind save back to Supabase
+    4) Append the listings to the partitioned Parquet dataset (listings_dataset.py)
+    Articles whose text, model, prompt, fields and ABM context match an earlier
+    run are served from the extraction memo (extraction_memo.py) without LLM calls.
+    on_progress(index, result, completed, total) is passed on to
+    summarize_articles_parallel. Returns token usage & a list of parsed_results.
+    """
+    total_in, total_out, total_cost = 0, 0, 0
+    parsed_results = []
+    run_stats.reset()
+
+    # Build Pydantic schema
+    DynamicListingModel = create_dynamic_listing_model(fields)
+    DynamicContainer   = create_listings_container_model(DynamicListingModel)
+
+    if not abm_context:
+        abm_context = get_abm_report_text()
+
+    # Read all markdowns in bulk
+    stored = read_raw_data_many(unique_names)
+    texts = {}
+    for uniq in unique_names:
+        if stored.get(uniq):
+            texts[uniq] = stored[uniq]
+        else:
+            logging.warning(f"No raw_data for {uniq}, skipping.")
+
+    # Unchanged articles get their stored result back
+    memo = get_extraction_memo()
+    memo_parts = {
+        uniq: memo.key_parts(text, selected_model, ROBOTICS_SYSTEM_MESSAGE, fields, abm_context)
+        for uniq, text in texts.items()
+    }
+    memoized = memo.get_many(list({memo.key(parts) for parts in memo_parts.values()}))
+    saved = 0.0
+    for uniq in list(texts):
+        hit = memoized.get(memo.key(memo_parts[uniq]))
+        if hit is None:
+            continue
+        parsed, cost = hit
+        saved += cost
+        del texts[uniq]
+        save_formatted_data(uniq, parsed)
+        parsed_results.append({
+            "unique_name": uniq,
+            "parsed_data": parsed,
+            "status": "success",
+            "memo_hit": True
+        })
+    record_lookup(len(memo_parts) - len(texts), len(texts), saved)
+
+    # Group syndicated copies and URL variants; only the first of each cluster is extracted
+    clusters = cluster_near_duplicates(texts)
+    valid_uniques = [cluster[0] for cluster in clusters]
+    duplicates = {cluster[0]: cluster[1:] for cluster in clusters}
+    markdowns = [texts[uniq][:MAX_CHARS] for uniq in valid_uniques]  # truncate here
+    if len(valid_uniques) < len(texts):
+        logging.info(f"Skipping {len(texts) - len(valid_uniques)} near-duplicate articles")
+
+    # 1) Summarize & JSON‑extract listings in parallel
+    logging.info(f"Extracting {len(markdowns)} articles with model {selected_model}")
+    results = summarize_articles_parallel(
+        markdowns, selected_model, ROBOTICS_SYSTEM_MESSAGE, abm_context, on_progress=on_progress
+    )
+
+    # 2) Post‑process each listing
+    for uniq, parsed in zip(valid_uniques, results):
+        try:
+            listings = parsed.get("listings", [])
+            for lst in listings:
+                # a) Enrich company metadata & ABM correlation
+                enrich_company_metadata(lst, selected_model)
+                correlate_with_abm(lst, abm_context, selected_model)
+                # b) Extract launch date if needed
+                if lst.get("Project Launch Date", "TBD") == "TBD":
+                    ld = extract_launch_date_from_article(texts[uniq], selected_model)
+                    lst["Project Launch Date"] = ld.get("project_launch_date", "TBD")
+                # c) Clean up URL
+                lst["Article URL"] = sanitize_article_url(lst.get("Article URL", ""))
+
+            # 3) Hand off to the write-behind queue; extraction never waits on the database
+            save_formatted_data(uniq, parsed)
+            if _is_real_extraction(parsed):
+                memo.put(memo_parts[uniq], parsed,
+                         extraction_cost(selected_model, texts[uniq], ROBOTICS_SYSTEM_MESSAGE, abm_context, parsed))
+            parsed_results.append({
+                "unique_name": uniq,
+                "parsed_data": parsed,
+                "status": "success"
+            })
+
+            # 4) Fan the listings out to every near-duplicate of this article
+            for dup in duplicates[uniq]:
+                dup_parsed = copy.deepcopy(parsed)
+                dup_url = get_frontier().url_for(dup)
+                if dup_url:
+                    for lst in dup_parsed.get("listings", []):
+                        lst["Article URL"] = dup_url
+                save_formatted_data(dup, dup_parsed)
+                if _is_real_extraction(dup_parsed):
+                    memo.put(memo_parts[dup], dup_parsed, extraction_cost(
+                        selected_model, texts[dup], ROBOTICS_SYSTEM_MESSAGE, abm_context, dup_parsed))
+                parsed_results.append({
+                    "unique_name": dup,
+                    "parsed_data": dup_parsed,
+                    "status": "success",
+                    "duplicate_of": uniq
+                })
+
+        except Exception as e:
+            logging.error(f"Processing failure for {uniq}: {e}")
+            for name in [uniq] + duplicates[uniq]:
+                parsed_results.append({
+                    "unique_name": name,
+                    "parsed_data": {},
+                    "status": "failed",
+                    "error": str(e)
+                })
+
+    try:
+        append_listings(parsed_results, model=selected_model)
+    except Exception as e:
+        logging.error(f"Appending listings to the Parquet dataset failed: {e}")
+
+    run_stats.report()    # llm_cache and extraction_memo hit rates for this run
+    return total_in, total_out, total_cost, parsed_results
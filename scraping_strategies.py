@@ -13,3 +13,14 @@ SCRAPING_STRATEGIES = {
     "siliconangle.com": "static",
     "siliconcanals.com": "static",
 }
+
+# Per-domain overrides for the Playwright resource-blocking policy
+# (see resource_blocking.py). Keys:
+#   "block_types":   replaces the default set of blocked resource types
+#   "block_domains": extra hosts to block on top of the default denylist
+#   "allow_domains": hosts that must never be blocked on this site
+RESOURCE_BLOCKING_OVERRIDES = {
+    # Infinite scroll waits on lazy images entering the viewport
+    "techcrunch.com": {"block_types": ["media", "font"]},
+    "iotworldtoday.com": {"block_types": ["media", "font"]},
+}
@@ -0,0 +1,113 @@
+# scroll_engine.py
+#
+# Event-driven scroll / "Load More" loop for Playwright listing pages.
+# After each scroll or click we wait until either the number of distinct article
+# anchors grows, or the page goes quiet (no DOM mutations and no finished network
+# resources for quiet_ms). The loop stops once growth stalls or a target count is hit.
+
+from typing import Optional
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from link_extractor import ARTICLE_HREF_RE
+
+ARTICLE_HREF_PATTERN = ARTICLE_HREF_RE.pattern   # JS RegExp-compatible
+LOAD_MORE_SELECTOR   = "button:has-text('Load More'), button:has-text('Show More'), button:has-text('More')"
+
+# Records the time of the last DOM mutation / completed network resource.
+_INSTALL_OBSERVERS_JS = """
+() => {
+    if (window.__scrollEngine) return;
+    const state = window.__scrollEngine = { lastActivity: performance.now(), actionAt: 0 };
+    const touch = () => { state.lastActivity = performance.now(); };
+    new MutationObserver(touch).observe(document.documentElement, { childList: true, subtree: true });
+    try { new PerformanceObserver(touch).observe({ type: "resource", buffered: false }); } catch (e) {}
+}
+"""
+
+_COUNT_JS = """
+(pattern) => {
+    const re = new RegExp(pattern, "i");
+    const seen = new Set();
+    for (const a of document.querySelectorAll("a[href]")) {
+        if (re.test(a.href)) seen.add(a.href.split("#")[0]);
+    }
+    return seen.size;
+}
+"""
+
+_MARK_ACTION_JS = "() => { window.__scrollEngine.actionAt = performance.now(); }"
+
+_GREW_OR_QUIET_JS = """
+([pattern, previous, quietMs]) => {
+    const state = window.__scrollEngine;
+    const re = new RegExp(pattern, "i");
+    const seen = new Set();
+    for (const a of document.querySelectorAll("a[href]")) {
+        if (re.test(a.href)) seen.add(a.href.split("#")[0]);
+    }
+    if (seen.size > previous) return true;
+    const since = Math.max(state.lastActivity, state.actionAt);
+    return performance.now() - since > quietMs;
+}
+"""
+
+
+def count_article_anchors(page, pattern: str = ARTICLE_HREF_PATTERN) -> int:
+    return page.evaluate(_COUNT_JS, pattern)
+
+
+def _click_load_more(page, selector: str) -> bool:
+    button = page.locator(selector)
+    if button.count() == 0:
+        return False
+    try:
+        button.first.click(timeout=3000)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+def scroll_until_stable(
+    page,
+    max_steps: int = 20,
+    target_links: Optional[int] = None,
+    stall_limit: int = 2,
+    quiet_ms: int = 800,
+    step_timeout_ms: int = 8000,
+    load_more_selector: str = LOAD_MORE_SELECTOR,
+    pattern: str = ARTICLE_HREF_PATTERN,
+) -> int:
+    """
+    Click "Load More" (or scroll to the bottom when there is no button) until the
+    article-anchor count stops growing for stall_limit steps, target_links is
+    reached, or max_steps is used up. Returns the final anchor count.
+    """
+    page.evaluate(_INSTALL_OBSERVERS_JS)
+    count = count_article_anchors(page, pattern)
+    stalls = 0
+
+    for step in range(max_steps):
+        if target_links and count >= target_links:
+            print(f"[Scroll] Target of {target_links} links reached.")
+            break
+
+        page.evaluate(_MARK_ACTION_JS)
+        action = "click" if _click_load_more(page, load_more_selector) else "scroll"
+        if action == "scroll":
+            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+
+        try:
+            page.wait_for_function(_GREW_OR_QUIET_JS, arg=[pattern, count, quiet_ms], timeout=step_timeout_ms)
+        except PlaywrightTimeoutError:
+            pass  # page kept mutating for the whole step; just re-count
+
+        new_count = count_article_anchors(page, pattern)
+        print(f"[Scroll] Step {step+1}/{max_steps} ({action}): {count} → {new_count} article links")
+        stalls = 0 if new_count > count else stalls + 1
+        count = new_count
+
+        if stalls >= stall_limit:
+            print("[Scroll] No new links, stopping.")
+            break
+
+    return count
@@ -0,0 +1,258 @@
+# storage.py
+#
+# Storage backends for the scraped_data table, behind markdown_io's
+# read_raw_data / save_raw_data and the formatted / pagination savers.
+#   SupabaseBackend - the hosted table (bulk in_() reads, chunked upserts)
+#   SQLiteBackend   - a local file in WAL mode, for offline runs and benchmarks
+# Either one is wrapped in CachedBackend, a bounded in-process read-through cache
+# of raw_data, so stages that re-read the same articles hit memory.
+#
+# STORAGE_BACKEND=supabase|sqlite picks one; by default Supabase is used when
+# credentials are configured and SQLite otherwise.
+
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+
+import run_stats
+from assets import CACHE_DIR
+
+SQLITE_PATH       = os.path.join(CACHE_DIR, "scraped_data.sqlite")
+READ_CHUNK        = 100                # unique_names per in_() filter; keeps the GET URL short
+WRITE_CHUNK       = 500                # rows per bulk upsert
+CACHE_MAX_ENTRIES = 2000
+CACHE_MAX_BYTES   = 64 * 1024 * 1024   # approximate: characters of cached raw_data
+
+COLUMNS = ("unique_name", "url", "raw_data", "raw_html", "formatted_data", "pagination_data")
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scraped_data (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    unique_name     TEXT NOT NULL UNIQUE,
+    url             TEXT,
+    raw_data        TEXT,
+    raw_html        TEXT,
+    formatted_data  TEXT,
+    pagination_data TEXT,
+    created_at      TEXT DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+# Errors from a scraped_data table created before unique_name was UNIQUE / raw_html existed
+_OUTDATED_SCHEMA_MARKERS = ("42P10", "no unique or exclusion constraint", "raw_html")
+
+
+class SchemaOutdated(RuntimeError):
+    """The Supabase table predates the unique_name constraint or the raw_html column."""
+
+
+def _group_by_columns(rows: List[Dict]) -> List[List[Dict]]:
+    """One row per unique_name (the last wins), grouped by column set."""
+    groups: Dict[tuple, List[Dict]] = {}
+    for row in {row["unique_name"]: row for row in rows}.values():
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    return list(groups.values())
+
+
+class StorageBackend(ABC):
+    name = "base"
+
+    @abstractmethod
+    def read_raw_many(self, unique_names: List[str]) -> Dict[str, str]:
+        """raw_data for the given names; missing names are absent."""
+
+    @abstractmethod
+    def upsert(self, rows: List[Dict], label: str = "rows") -> Set[str]:
+        """Insert or update rows on unique_name, touching only the columns each row has. Returns failed names."""
+
+
+class SupabaseBackend(StorageBackend):
+    name = "supabase"
+
+    def __init__(self, client):
+        self.client = client
+
+    def _execute(self, query, op: str):
+        run_stats.incr("supabase", "round_trips")
+        run_stats.incr("supabase", op)
+        return query.execute()
+
+    def read_raw_many(self, unique_names: List[str]) -> Dict[str, str]:
+        found = {}
+        for i in range(0, len(unique_names), READ_CHUNK):
+            chunk = unique_names[i:i + READ_CHUNK]
+            try:
+                response = self._execute(
+                    self.client.table("scraped_data").select("unique_name, raw_data").in_("unique_name", chunk), "reads"
+                )
+                found.update({row["unique_name"]: row.get("raw_data") or "" for row in response.data or []})
+            except Exception as e:
+                print(f"[ERROR] read_raw_data_many failed for {len(chunk)} names: {e}")
+        return found
+
+    def upsert(self, rows: List[Dict], label: str = "rows") -> Set[str]:
+        # Rows are grouped by column set so a missing column never overwrites stored data with NULL
+        failed = set()
+        for group in _group_by_columns(rows):
+            for i in range(0, len(group), WRITE_CHUNK):
+                chunk = group[i:i + WRITE_CHUNK]
+                try:
+                    self._execute(self.client.table("scraped_data").upsert(chunk, on_conflict="unique_name"), "writes")
+                except Exception as e:
+                    if any(marker in str(e) for marker in _OUTDATED_SCHEMA_MARKERS):
+                        raise SchemaOutdated(
+                            f"scraped_data needs the migration under 'Upgrading an existing table' in README.md "
+                            f"(ADD COLUMN raw_html, UNIQUE (unique_name)): {e}"
+                        ) from e
+                    print(f"[ERROR] saving {label} failed for {len(chunk)} rows: {e}")
+                    failed.update(row["unique_name"] for row in chunk)
+        return failed
+
+
+class SQLiteBackend(StorageBackend):
+    name = "sqlite"
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SQLITE_SCHEMA)
+        return self._conn
+
+    def read_raw_many(self, unique_names: List[str]) -> Dict[str, str]:
+        found = {}
+        with self._lock:
+            for i in range(0, len(unique_names), 500):
+                chunk = unique_names[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._db().execute(
+                    f"SELECT unique_name, raw_data FROM scraped_data WHERE unique_name IN ({marks})", chunk
+                ).fetchall()
+                found.update({name: raw or "" for name, raw in rows})
+        return found
+
+    def upsert(self, rows: List[Dict], label: str = "rows") -> Set[str]:
+        failed = set()
+        with self._lock:
+            db = self._db()
+            for group in _group_by_columns(rows):
+                columns = [c for c in COLUMNS if c in group[0]]
+                updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "unique_name")
+                sql = (f"INSERT INTO scraped_data ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                       f"ON CONFLICT(unique_name) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING"))
+                values = [
+                    [row[c] if row[c] is None or isinstance(row[c], str) else json.dumps(row[c]) for c in columns]
+                    for row in group
+                ]
+                try:
+                    with db:
+                        db.executemany(sql, values)
+                except sqlite3.Error as e:
+                    print(f"[ERROR] saving {label} failed for {len(group)} rows: {e}")
+                    failed.update(row["unique_name"] for row in group)
+        return failed
+
+
+class CachedBackend(StorageBackend):
+    """Bounded LRU read-through cache of raw_data in front of another backend; writes go through."""
+
+    def __init__(self, backend: StorageBackend, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        self.backend = backend
+        self.name = backend.name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+
+    def _put(self, unique_name: str, raw_data: str):
+        old = self._cache.pop(unique_name, None)
+        if old is not None:
+            self._bytes -= len(old)
+        if len(raw_data) > self.max_bytes:
+            return
+        self._cache[unique_name] = raw_data
+        self._bytes += len(raw_data)
+        while len(self._cache) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def read_raw_many(self, unique_names: List[str]) -> Dict[str, str]:
+        found, missing = {}, []
+        with self._lock:
+            for name in unique_names:
+                if name in self._cache:
+                    self._cache.move_to_end(name)
+                    found[name] = self._cache[name]
+                else:
+                    missing.append(name)
+        run_stats.incr("storage_cache", "hits", len(found))
+        run_stats.incr("storage_cache", "misses", len(missing))
+        if missing:
+            loaded = self.backend.read_raw_many(missing)
+            with self._lock:
+                for name, raw in loaded.items():
+                    self._put(name, raw)
+            found.update(loaded)
+        return found
+
+    def upsert(self, rows: List[Dict], label: str = "rows") -> Set[str]:
+        failed = self.backend.upsert(rows, label)
+        with self._lock:
+            for row in rows:
+                if "raw_data" in row and row["unique_name"] not in failed and isinstance(row["raw_data"], str):
+                    self._put(row["unique_name"], row["raw_data"])
+        return failed
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._bytes = 0
+
+
+def _make_backend(credentials) -> StorageBackend:
+    if credentials:
+        from supabase import create_client
+        return SupabaseBackend(create_client(*credentials))
+    print(f"[Storage] Using local SQLite storage at {SQLITE_PATH}")
+    return SQLiteBackend()
+
+
+def _configured_credentials():
+    choice = os.getenv("STORAGE_BACKEND", "").lower()
+    if choice == "sqlite":
+        return None
+    from api_management import get_supabase_credentials
+    credentials = get_supabase_credentials()
+    if credentials is None and choice == "supabase":
+        raise RuntimeError("STORAGE_BACKEND=supabase but SUPABASE_URL / SUPABASE_ANON_KEY are not set")
+    return credentials
+
+
+_storage: Optional[CachedBackend] = None
+_storage_credentials = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> CachedBackend:
+    """The configured backend behind the read-through cache; rebuilt if the Supabase settings change."""
+    global _storage, _storage_credentials
+    credentials = _configured_credentials()
+    if _storage is None or credentials != _storage_credentials:
+        with _storage_lock:
+            if _storage is None or credentials != _storage_credentials:
+                _storage = CachedBackend(_make_backend(credentials))
+                _storage_credentials = credentials
+    return _storage
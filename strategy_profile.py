@@ -0,0 +1,110 @@
+# strategy_profile.py
+#
+# Persisted per-domain record of which pagination strategy actually produced
+# article links, with its latency, link yield and failure rate. Seeded from
+# SCRAPING_STRATEGIES; generic_pagination.scrape_all_article_links uses it to go
+# straight to the cheapest working strategy and only re-probes periodically.
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from assets import CACHE_DIR
+from scraping_strategies import SCRAPING_STRATEGIES
+
+PROFILE_PATH       = os.path.join(CACHE_DIR, "strategy_profiles.json")
+STRATEGIES         = ("static", "link", "load_more", "scroll")
+REPROBE_AFTER      = 7 * 24 * 3600   # seconds between auto-detection runs per domain
+MAX_FAILURE_RATE   = 0.5             # strategies failing more often than this are not chosen
+MIN_ATTEMPTS_TRUST = 1
+
+
+def domain_of(url: str) -> str:
+    return urlparse(url).netloc.lower().replace("www.", "")
+
+
+def _empty_stats() -> Dict[str, float]:
+    return {"attempts": 0, "successes": 0, "failures": 0, "latency_total": 0.0, "links_total": 0, "last_used": 0.0}
+
+
+class StrategyProfiles:
+    def __init__(self, path: str = PROFILE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"[StrategyProfile] Could not read {path}: {e}")
+
+    def _profile(self, domain: str) -> Dict:
+        profile = self._data.get(domain)
+        if profile is None:
+            # A new profile counts as freshly probed: the seed is trusted until REPROBE_AFTER
+            profile = {"seed": SCRAPING_STRATEGIES.get(domain), "last_probe": time.time(), "strategies": {}}
+            self._data[domain] = profile
+        return profile
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def record(self, url: str, strategy: str, links: int, latency: float, probe: bool = False):
+        """Record one run of a strategy; a run with zero links counts as a failure."""
+        with self._lock:
+            profile = self._profile(domain_of(url))
+            stats = profile["strategies"].setdefault(strategy, _empty_stats())
+            stats["attempts"] += 1
+            stats["successes" if links else "failures"] += 1
+            stats["latency_total"] += latency
+            stats["links_total"] += links
+            stats["last_used"] = time.time()
+            if probe:
+                profile["last_probe"] = time.time()
+            self._save()
+
+    def best_strategy(self, url: str) -> Optional[str]:
+        """
+        Cheapest (lowest mean latency) strategy with an acceptable failure rate,
+        or the SCRAPING_STRATEGIES seed when nothing has been measured yet.
+        Returns None when the domain is unknown, due for a re-probe, or its seed
+        has been tried and never produced links.
+        """
+        with self._lock:
+            profile = self._profile(domain_of(url))
+            measured = {
+                name: s for name, s in profile["strategies"].items()
+                if s["attempts"] >= MIN_ATTEMPTS_TRUST and s["successes"]
+                and s["failures"] / s["attempts"] <= MAX_FAILURE_RATE
+            }
+            if not measured:
+                # The seed is tried until it has had a fair chance; one that never worked is not
+                seed = profile["strategies"].get(profile["seed"]) or _empty_stats()
+                if seed["attempts"] >= MIN_ATTEMPTS_TRUST and not seed["successes"]:
+                    return None
+                return profile["seed"]
+            if time.time() - profile["last_probe"] > REPROBE_AFTER:
+                return None
+            return min(measured, key=lambda n: measured[n]["latency_total"] / measured[n]["attempts"])
+
+    def summary(self, url: str) -> Dict:
+        with self._lock:
+            return json.loads(json.dumps(self._profile(domain_of(url))))
+
+
+_profiles: Optional[StrategyProfiles] = None
+
+
+def get_profiles() -> StrategyProfiles:
+    global _profiles
+    if _profiles is None:
+        _profiles = StrategyProfiles()
+    return _profiles
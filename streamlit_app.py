@@ -7,21 +7,21 @@ import json
 import re
 import sys
 import asyncio
-from urllib.parse import urlparse
 
 from crawl import crawl_and_extract
 from scraper import scrape_urls
 from assets import MODELS_USED
-from api_management import get_supabase_client
+from storage import get_storage
+from listings_dataset import LISTINGS_DIR
 from abm_docs import extract_text_from_pdf, get_abm_report_text
 from utils import generate_pdf_summary
-from scraping_strategies import SCRAPING_STRATEGIES
+from strategy_profile import get_profiles
 
 
 
 def get_strategy(url: str) -> str:
-    domain = urlparse(url).netloc.replace("www.", "")
-    return SCRAPING_STRATEGIES.get(domain, "static")
+    # Learned per-domain profile (seeded from SCRAPING_STRATEGIES); "auto" = will be probed
+    return get_profiles().best_strategy(url) or "auto"
 
 
 # On Windows, use the ProactorEventLoop
@@ -30,10 +30,9 @@ if sys.platform.startswith("win"):
 
 # Streamlit page setup
 st.set_page_config(page_title="🤖 Robotics Articles Scraper", layout="wide")
-supabase = get_supabase_client()
-if not supabase:
-    st.error("🚨 Supabase is not configured! Please set SUPABASE_URL and SUPABASE_ANON_KEY in the sidebar.")
-    st.stop()
+if get_storage().name != "supabase":
+    st.info("💾 Supabase is not configured: results are stored locally in .scraper_cache/scraped_data.sqlite. "
+            "Set SUPABASE_URL and SUPABASE_ANON_KEY to use Supabase.")
 
 st.title("🤖 Robotics Articles Scraper")
 
@@ -127,6 +126,8 @@ if st.sidebar.button("🚀 Start Scraping"):
         st.session_state["model_selection"] = model_choice
         st.session_state["unique_names"]     = all_unique_names
         st.session_state["scraping_state"]   = "scraping"
+        st.session_state.pop("scrape_result", None)   # new run: extract once, then reuse across reruns
+        st.session_state.pop("downloads", None)
 
         # Now your existing `if st.session_state["scraping_state"] == "scraping":` block will fire
 
@@ -137,20 +138,26 @@ if st.sidebar.button("🚀 Start Scraping"):
 #
 if st.session_state.get("scraping_state") == "scraping":
 
-    with st.spinner("🛠️ Processing articles…"):
-        in_t, out_t, cost_t, parsed = scrape_urls(
-            st.session_state.unique_names,
-            # These are your 18 default fields
-            [
-                "Article Name", "Article Summary", "Article Date", "Article URL",
-                "Company", "Company Info", "Region", "Company Size", "Raised Funding",
-                "Recent Developments", "Partnerships", "Media Mentions", "Focus",
-                "Humanoid Robotics Use Case", "Single Use Cases", "Task Streamlining",
-                "Project launch date", "Relevancy Score", "Correlation Reason"
-            ],
-            model_choice,
-            abm_context
-        )
+    if "scrape_result" not in st.session_state:
+        with st.spinner("🛠️ Processing articles…"):
+            progress = st.progress(0.0, text="Extracting articles…")
+            st.session_state.scrape_result = scrape_urls(
+                st.session_state.unique_names,
+                # These are your 18 default fields
+                [
+                    "Article Name", "Article Summary", "Article Date", "Article URL",
+                    "Company", "Company Info", "Region", "Company Size", "Raised Funding",
+                    "Recent Developments", "Partnerships", "Media Mentions", "Focus",
+                    "Humanoid Robotics Use Case", "Single Use Cases", "Task Streamlining",
+                    "Project launch date", "Relevancy Score", "Correlation Reason"
+                ],
+                model_choice,
+                abm_context,
+                on_progress=lambda i, result, done, total: progress.progress(
+                    done / total, text=f"Extracted {done}/{total} articles"
+                ),
+            )
+    in_t, out_t, cost_t, parsed = st.session_state.scrape_result
     st.success("✅ Done scraping & parsing!")
 
     # Show ABM summary if any
@@ -183,7 +190,7 @@ if st.session_state.get("scraping_state") == "scraping":
     # Optional: filter by relevancy
     if "Relevancy Score" in df.columns:
         df["Relevancy Score"] = pd.to_numeric(df["Relevancy Score"], errors="coerce")
-        min_score = st.slider("🎯 Min Relevancy Score", 1, 5, 3)
+        min_score = st.slider("🎯 Min Relevancy Score", 1, 5, 3, key="min_score_filter")
         df = df[df["Relevancy Score"] >= min_score]
 
     # Display paginated table
@@ -209,11 +216,17 @@ if st.session_state.get("scraping_state") == "scraping":
             st.session_state.page += 1
             st.rerun()
 
-    # Download buttons
+    # Download buttons; serialized once per run and score filter instead of on every rerun
     st.subheader("💾 Download Data")
-    json_data = json.dumps(records, indent=2)
-    st.download_button("Download JSON", data=json_data, file_name="scraped_data.json")
+    downloads = st.session_state.setdefault("downloads", {})
+    if "json" not in downloads:
+        downloads["json"] = json.dumps(records, indent=2)
+    st.download_button("Download JSON", data=downloads["json"], file_name="scraped_data.json")
 
     if not df.empty:
-        csv_data = df.to_csv(index=False)
-        st.download_button("Download CSV", data=csv_data, file_name="scraped_data.csv")
+        csv_key = ("csv", len(df), st.session_state.get("min_score_filter"))
+        if csv_key not in downloads:
+            downloads[csv_key] = df.to_csv(index=False)
+        st.download_button("Download CSV", data=downloads[csv_key], file_name="scraped_data.csv")
+    st.caption(f"Every run also appends its listings to the Parquet dataset in `{LISTINGS_DIR}` "
+               "(partitioned by run date and domain; load it with `listings_dataset.read_listings()`).")
@@ -0,0 +1,27 @@
+import os
+import unittest
+
+from content_extraction import MIN_CONTENT_CHARS, extract_main_content
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+
+
+class FormWrappedArticleTest(unittest.TestCase):
+    """ASP.NET WebForms pages (e.g. azorobotics.com) wrap the whole body in one <form>."""
+
+    def setUp(self):
+        with open(os.path.join(FIXTURES, "aspnet_form_article.html"), encoding="utf-8") as f:
+            self.doc = extract_main_content(f.read(), "https://www.azorobotics.com/News.aspx?newsID=15432")
+
+    def test_article_body_is_extracted(self):
+        self.assertGreaterEqual(len(self.doc["text"]), MIN_CONTENT_CHARS)
+        self.assertIn("octopus wraps its tentacles", self.doc["text"])
+        self.assertIn("warehouse picking robots", self.doc["text"])
+
+    def test_form_controls_are_left_out(self):
+        self.assertNotIn("Leave a comment", self.doc["text"])
+        self.assertNotIn("Search", self.doc["text"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from unittest import mock
+
+import generic_pagination
+from generic_pagination import static_page_url, static_pagination_scrape
+
+
+class StaticPageUrlTest(unittest.TestCase):
+    def test_query_page_number_is_replaced(self):
+        base = "https://www.azorobotics.com/robotics-news.aspx?page=2"
+        self.assertEqual(static_page_url(base, 1), "https://www.azorobotics.com/robotics-news.aspx?page=1")
+        self.assertEqual(static_page_url(base, 12), "https://www.azorobotics.com/robotics-news.aspx?page=12")
+
+    def test_path_page_number_is_replaced(self):
+        base = "https://siliconangle.com/category/robotics/page/2/"
+        self.assertEqual(static_page_url(base, 3), "https://siliconangle.com/category/robotics/page/3/")
+
+    def test_page_is_appended_without_a_number(self):
+        base = "https://www.robotics247.com/news/"
+        self.assertEqual(static_page_url(base, 1), base)
+        self.assertEqual(static_page_url(base, 2), "https://www.robotics247.com/news/page/2/")
+
+    def test_scrape_builds_every_page_url(self):
+        requested = []
+
+        def fake_paginate(page_url, extract_links, max_pages):
+            requested.extend(page_url(i) for i in range(1, max_pages + 1))
+            return [["https://www.azorobotics.com/News.aspx?newsID=1"]]
+
+        with mock.patch.object(generic_pagination, "speculative_paginate", fake_paginate):
+            links = static_pagination_scrape("https://www.azorobotics.com/robotics-news.aspx?page=2", max_pages=3)
+        self.assertEqual(links, ["https://www.azorobotics.com/News.aspx?newsID=1"])
+        self.assertEqual(requested, [f"https://www.azorobotics.com/robotics-news.aspx?page={i}" for i in (1, 2, 3)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import markdown_io
+import pagination
+import scraper
+from extraction_memo import ExtractionMemo
+from frontier import Frontier
+from storage import StorageBackend
+from write_behind import WriteBehindQueue
+
+ARTICLES = {
+    "a_1": "Figure AI raised a new round to build humanoid robots for warehouses.",
+    "b_2": "Agility Robotics starts a commercial pilot of its Digit robot.",
+    "c_3": "Locus Robotics passes five billion picks across its customer sites.",
+}
+
+
+class CountingBackend(StorageBackend):
+    """In-memory backend that records every round trip."""
+    name = "counting"
+
+    def __init__(self, rows):
+        self.rows = {name: {"raw_data": text} for name, text in rows.items()}
+        self.reads = []
+        self.upserts = []
+
+    def read_raw_many(self, unique_names):
+        self.reads.append(list(unique_names))
+        return {n: self.rows[n]["raw_data"] for n in unique_names if n in self.rows}
+
+    def upsert(self, rows, label="rows"):
+        self.upserts.append([row["unique_name"] for row in rows])
+        for row in rows:
+            self.rows.setdefault(row["unique_name"], {}).update(row)
+        return set()
+
+
+class StorageRoundTripsTest(unittest.TestCase):
+    """N articles cost one bulk read and one batched write, not N of each."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.backend = CountingBackend(ARTICLES)
+        self.queue = WriteBehindQueue(max_delay=60)    # nothing flushes until flush()
+        for patch in (
+            mock.patch.object(markdown_io, "get_storage", return_value=self.backend),
+            mock.patch.object(markdown_io, "get_write_queue", return_value=self.queue),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmp.cleanup()
+
+    def test_paginate_urls(self):
+        names = list(ARTICLES)
+        reply = ({"page_urls": []}, {"input_tokens": 1, "output_tokens": 1}, 0.0)
+        with mock.patch.object(pagination, "call_llm_model", return_value=reply) as llm:
+            pagination.paginate_urls(names, "gpt-4o", "", [f"https://example.com/{n}" for n in names])
+        self.assertTrue(self.queue.flush(timeout=10))
+
+        self.assertEqual(llm.call_count, len(names))
+        self.assertEqual(self.backend.reads, [names])
+        self.assertEqual(self.backend.upserts, [names])
+
+    def test_scrape_urls(self):
+        names = list(ARTICLES)
+        patches = (
+            mock.patch.object(scraper, "create_dynamic_listing_model"),
+            mock.patch.object(scraper, "create_listings_container_model"),
+            mock.patch.object(scraper, "summarize_articles_parallel",
+                              side_effect=lambda mds, *a, **kw: [{"listings": []} for _ in mds]),
+            mock.patch.object(scraper, "get_extraction_memo",
+                              return_value=ExtractionMemo(os.path.join(self.tmp.name, "memo.sqlite"))),
+            mock.patch.object(scraper, "get_frontier",
+                              return_value=Frontier(os.path.join(self.tmp.name, "frontier.sqlite"))),
+            mock.patch.object(scraper, "append_listings"),
+        )
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        *_, results = scraper.scrape_urls(names, ["Company"], "gpt-4o", abm_context="ABM report")
+        self.assertTrue(self.queue.flush(timeout=10))
+
+        self.assertEqual([r["status"] for r in results], ["success"] * len(names))
+        self.assertEqual(self.backend.reads, [names])
+        self.assertEqual(len(self.backend.upserts), 1)
+        self.assertCountEqual(self.backend.upserts[0], names)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+
+from strategy_profile import MIN_ATTEMPTS_TRUST, StrategyProfiles
+
+URL = "https://www.therobotreport.com/category/news/"   # seeded as "load_more"
+
+
+class BestStrategyTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.profiles = StrategyProfiles(path=os.path.join(self.tmp.name, "profiles.json"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_untried_seed_is_used(self):
+        self.assertEqual(self.profiles.best_strategy(URL), "load_more")
+
+    def test_seed_that_always_fails_is_dropped(self):
+        for _ in range(MIN_ATTEMPTS_TRUST):
+            self.profiles.record(URL, "load_more", links=0, latency=5.0)
+        self.assertIsNone(self.profiles.best_strategy(URL))
+
+    def test_seed_that_worked_once_is_kept(self):
+        self.profiles.record(URL, "load_more", links=12, latency=5.0)
+        self.profiles.record(URL, "load_more", links=0, latency=5.0)
+        self.profiles.record(URL, "load_more", links=0, latency=5.0)
+        self.assertEqual(self.profiles.best_strategy(URL), "load_more")
+
+    def test_cheapest_working_strategy_wins(self):
+        self.profiles.record(URL, "load_more", links=12, latency=9.0)
+        self.profiles.record(URL, "static", links=20, latency=1.0)
+        self.assertEqual(self.profiles.best_strategy(URL), "static")
+
+
+if __name__ == "__main__":
+    unittest.main()
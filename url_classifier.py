@@ -0,0 +1,201 @@
+# url_classifier.py
+#
+# Local article-vs-non-article classifier for discovered links, so tag pages,
+# category indexes, author pages and section roots never reach fetch, storage and
+# the LLM calls. Scores are a sum of log-odds from path-shape features, anchor
+# text and link position, plus per-domain URL templates (/{YYYY}/{MM}/{DD}/{slug})
+# learned from which past URLs turned out to contain an article.
+
+import json
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from assets import CACHE_DIR
+
+TEMPLATE_PATH      = os.path.join(CACHE_DIR, "url_templates.json")
+THRESHOLD          = 0.5
+MIN_TEMPLATE_OBS   = 3       # observations before a learned template counts
+MAX_TEMPLATE_LOGIT = 3.0
+MAX_SCORED         = 20000   # (url, anchor) scores kept for filter(), least recently used dropped
+
+NON_ARTICLE_SEGMENTS = {
+    "tag", "tags", "category", "categories", "author", "authors", "page", "topic", "topics",
+    "search", "about", "about-us", "contact", "contact-us", "events", "webinars", "subscribe",
+    "login", "register", "signup", "feed", "rss", "wp-content", "wp-json", "wp-admin", "privacy",
+    "privacy-policy", "terms", "advertise", "newsletter", "newsletters", "careers", "jobs", "cart",
+    "account", "archive", "archives", "sitemap", "cdn-cgi",
+}
+NON_HTML_EXT_RE = re.compile(r"\.(jpe?g|png|gif|svg|webp|pdf|xml|css|js|zip|mp4|mp3)$", re.I)
+DATED_PATH_RE   = re.compile(r"/(19|20)\d{2}/\d{1,2}(/\d{1,2})?/[^/]+")
+PAGING_QUERY_RE = re.compile(r"(^|&)(page|paged|p|s|q|replytocom)=", re.I)
+ID_QUERY_RE     = re.compile(r"(^|&)\w*id=\d+", re.I)          # News.aspx?newsID=123
+NAV_TEXT_RE     = re.compile(r"^(home|next|prev(ious)?|older|newer|more|menu|login|subscribe|see all|view all|\d+|»|«|>|<)$", re.I)
+READ_MORE_RE    = re.compile(r"read more|continue reading|full story", re.I)
+
+
+def _domain(url: str) -> str:
+    return urlparse(url).netloc.lower().replace("www.", "")
+
+
+def _segments(path: str) -> List[str]:
+    return [s for s in path.lower().split("/") if s]
+
+
+def url_template(url: str) -> str:
+    """Path shape with variable parts abstracted, e.g. /{YYYY}/{MM}/{DD}/{slug}."""
+    shape = []
+    for seg in _segments(urlparse(url).path):
+        if re.fullmatch(r"(19|20)\d{2}", seg):
+            shape.append("{YYYY}")
+        elif re.fullmatch(r"\d{1,2}", seg):
+            shape.append("{MM}" if shape and shape[-1] == "{YYYY}" else "{DD}" if shape and shape[-1] == "{MM}" else "{N}")
+        elif seg.isdigit():
+            shape.append("{ID}")
+        elif re.search(r"[-_]", seg) and len(seg) > 10:
+            shape.append("{slug}")
+        elif re.search(r"\d", seg) and len(seg) > 6:
+            shape.append("{ID}")
+        else:
+            shape.append(seg)
+    return "/" + "/".join(shape)
+
+
+def path_features(url: str) -> Dict[str, float]:
+    """Log-odds contributions from the URL alone."""
+    parsed = urlparse(url)
+    segs = _segments(parsed.path)
+    f: Dict[str, float] = {}
+    if not segs:
+        f["root"] = -4.0
+        return f
+    last = segs[-1]
+    if NON_HTML_EXT_RE.search(parsed.path):
+        f["non_html"] = -4.0
+    hyphens = len(re.findall(r"[-_]", last))     # robotics247 slugs use underscores
+    if any(s in NON_ARTICLE_SEGMENTS for s in segs) \
+            or (hyphens <= 2 and any(t in NON_ARTICLE_SEGMENTS for t in re.split(r"[-_]", last))):
+        f["section_segment"] = -3.0
+    if DATED_PATH_RE.search(parsed.path.lower()):
+        f["dated"] = 3.0
+    if hyphens >= 3:
+        f["long_slug"] = 2.0
+    elif hyphens >= 1:
+        f["short_slug"] = 0.5
+    elif len(last) <= 12 and not last.isdigit():
+        f["bare_word"] = -1.5      # section roots such as /news/ or /robotics/
+    if re.search(r"\d{5,}", last):
+        f["numeric_id"] = 1.0
+    if len(segs) == 1 and hyphens < 2:
+        f["shallow"] = -1.0
+    if PAGING_QUERY_RE.search(parsed.query):
+        f["paging_query"] = -1.5
+    elif ID_QUERY_RE.search(parsed.query):
+        f["id_query"] = 2.5
+    return f
+
+
+def anchor_features(text: str = "", position: Optional[float] = None) -> Dict[str, float]:
+    """Log-odds contributions from the anchor text and relative position (0..1) in the page."""
+    f: Dict[str, float] = {}
+    text = (text or "").strip()
+    if text:
+        words = len(text.split())
+        if READ_MORE_RE.search(text):
+            f["read_more"] = 0.5
+        elif NAV_TEXT_RE.match(text):
+            f["nav_text"] = -2.0
+        elif words >= 4:
+            f["headline_text"] = 1.5
+        elif words <= 2:
+            f["short_text"] = -0.5
+    if position is not None and (position < 0.05 or position > 0.95):
+        f["edge_position"] = -0.5    # header / footer navigation
+    return f
+
+
+class UrlClassifier:
+    def __init__(self, path: str = TEMPLATE_PATH, threshold: float = THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._templates: Dict[str, Dict[str, List[int]]] = {}   # domain -> template -> [articles, non-articles]
+        self._scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()   # (url, anchor text) -> score, LRU
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._templates = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"[UrlClassifier] Could not read {path}: {e}")
+
+    def _template_logit(self, url: str) -> float:
+        pos, neg = self._templates.get(_domain(url), {}).get(url_template(url), (0, 0))
+        if pos + neg < MIN_TEMPLATE_OBS:
+            return 0.0
+        return max(-MAX_TEMPLATE_LOGIT, min(MAX_TEMPLATE_LOGIT, math.log((pos + 1) / (neg + 1))))
+
+    def features(self, url: str, anchor_text: str = "", position: Optional[float] = None) -> Dict[str, float]:
+        f = path_features(url)
+        f.update(anchor_features(anchor_text, position))
+        template = self._template_logit(url)
+        if template:
+            f["template"] = template
+        return f
+
+    def score(self, url: str, anchor_text: str = "", position: Optional[float] = None) -> float:
+        """Probability-like score in (0, 1) that url is an article page."""
+        p = 1 / (1 + math.exp(-sum(self.features(url, anchor_text, position).values())))
+        key = (url, (anchor_text or "").strip())
+        with self._lock:
+            self._scores[key] = p
+            self._scores.move_to_end(key)
+            while len(self._scores) > MAX_SCORED:
+                self._scores.popitem(last=False)
+        return p
+
+    def is_article(self, url: str, anchor_text: str = "", position: Optional[float] = None) -> bool:
+        return self.score(url, anchor_text, position) >= self.threshold
+
+    def filter(self, urls: Iterable[str]) -> List[str]:
+        """
+        Keep article-looking URLs. A URL already scored with its anchor context
+        (by link_extractor) keeps that score; others are scored on the URL alone.
+        """
+        with self._lock:
+            best: Dict[str, float] = {}
+            for (url, _), p in self._scores.items():
+                best[url] = max(p, best.get(url, 0.0))
+        kept = []
+        for url in urls:
+            known = best.get(url)
+            if (known if known is not None else self.score(url)) >= self.threshold:
+                kept.append(url)
+        return kept
+
+    def learn(self, url: str, is_article: bool):
+        """Record whether url turned out to hold an article (call save() to persist)."""
+        with self._lock:
+            counts = self._templates.setdefault(_domain(url), {}).setdefault(url_template(url), [0, 0])
+            counts[0 if is_article else 1] += 1
+
+    def save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._templates, f, indent=2)
+            os.replace(tmp, self.path)
+
+
+_classifier: Optional[UrlClassifier] = None
+
+
+def get_url_classifier() -> UrlClassifier:
+    global _classifier
+    if _classifier is None:
+        _classifier = UrlClassifier()
+    return _classifier
@@ -0,0 +1,38 @@
+# url_utils.py
+#
+# Canonical URL form used as the dedupe key across runs (frontier, caches).
+
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "ref", "ref_src", "referrer", "cmpid", "ncid", "sr_share",
+    "guccounter", "guce_referrer", "guce_referrer_sig", "amp",
+}
+TRACKING_PREFIXES = ("utm_", "_hs", "mkt_", "vero_", "oly_")
+
+
+def _is_tracking(param: str) -> bool:
+    p = param.lower()
+    return p in TRACKING_PARAMS or p.startswith(TRACKING_PREFIXES)
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonicalize a URL: lower-case scheme/host, drop default ports, fragments,
+    tracking query params and the trailing slash, and sort remaining params.
+    """
+    url = (url or "").strip()
+    parts = urlsplit(url)
+    if not parts.scheme or not parts.netloc:
+        return url.split("#")[0].rstrip("/")
+
+    scheme = parts.scheme.lower()
+    host = parts.netloc.lower()
+    if (scheme, host.rsplit(":", 1)[-1]) in {("http", "80"), ("https", "443")}:
+        host = host.rsplit(":", 1)[0]
+
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k)))
+    return urlunsplit((scheme, host, path, query, ""))
@@ -4,7 +4,8 @@ import json
 import uuid
 import requests
 from datetime import datetime, timedelta
-from litellm import completion
+from llm_cache import completion
+from llm_calls import UnparseableReply, _parse_json_reply, parsed_completion
 from assets import MODELS_USED
 from api_management import get_api_key
 from news_utils import get_media_mentions
@@ -65,6 +66,15 @@ Only return a clear and concise summary, without additional commentary, formatti
     except Exception:
         return "Summary unavailable."
 
+def _json_completion(model: str, system: str, prompt: str):
+    """
+    The reply parsed as JSON. A reply that does not parse is dropped from
+    llm_cache and asked for once more (see llm_calls.parsed_completion), so it is
+    not replayed on later runs; raises UnparseableReply if that fails too.
+    """
+    messages = [{"role": "system", "content": system}, {"role": "user", "content": prompt}]
+    return parsed_completion(model, messages, _parse_json_reply)[1]
+
 def enrich_company_metadata(listing, model: str = "gpt-4o"):
     """
     Extract and enrich company metadata using the company's own sources (website + article).
@@ -122,15 +132,9 @@ Output only a valid JSON object. No explanations, markdown, or extra formatting.
 """
 
     try:
-        resp = completion(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You extract company profile insights from website and article text."},
-                {"role": "user", "content": prompt}
-            ],
-            seed=42
+        enriched = _json_completion(
+            model, "You extract company profile insights from website and article text.", prompt
         )
-        enriched = json.loads(resp.choices[0].message.content)
     except Exception as e:
         print("[enrich_company_metadata] JSON parse error:", e)
         return
@@ -280,16 +284,10 @@ def extract_single_use_case(listing, model: str = "gpt-4o"):
 You are an AI assistant. Identify if the company’s robots are single‑use case.
 Return JSON: {"single_use_case_type":"Yes/No","description":"..."}
 """
-    resp = completion(
-        model=model,
-        messages=[{"role":"system","content":"You extract single-use robotics info."},
-                  {"role":"user","content":prompt}],
-        seed=42
-    )
     try:
-        obj = json.loads(resp.choices[0].message.content)
+        obj = _json_completion(model, "You extract single-use robotics info.", prompt)
         listing.update(obj)
-    except Exception as e:
+    except UnparseableReply as e:
         print("[extract_single_use_case] JSON parse error:", e)
 
 def extract_task_streamlining(listing, model: str = "gpt-4o"):
@@ -313,16 +311,10 @@ def extract_task_streamlining(listing, model: str = "gpt-4o"):
 You are an AI assistant. Determine if the company uses robotics to streamline tasks.
 Return JSON: {"task_streamlining":"Yes/No","description":"..."}
 """
-    resp = completion(
-        model=model,
-        messages=[{"role":"system","content":"You extract task streamlining info."},
-                  {"role":"user","content":prompt}],
-        seed=42
-    )
     try:
-        obj = json.loads(resp.choices[0].message.content)
+        obj = _json_completion(model, "You extract task streamlining info.", prompt)
         listing.update(obj)
-    except Exception as e:
+    except UnparseableReply as e:
         print("[extract_task_streamlining] JSON parse error:", e)
 
 def extract_humanoid_use_case(listing, model: str = "gpt-4o"):
@@ -342,16 +334,10 @@ def extract_humanoid_use_case(listing, model: str = "gpt-4o"):
 You are an AI assistant. Check if the company works on humanoid robots.
 Return JSON: {"humanoid_use_case":"Yes/No","description":"..."}
 """
-    resp = completion(
-        model=model,
-        messages=[{"role":"system","content":"You extract humanoid robotics info."},
-                  {"role":"user","content":prompt}],
-        seed=42
-    )
     try:
-        obj = json.loads(resp.choices[0].message.content)
+        obj = _json_completion(model, "You extract humanoid robotics info.", prompt)
         listing.update(obj)
-    except Exception as e:
+    except UnparseableReply as e:
         print("[extract_humanoid_use_case] JSON parse error:", e)
 
 def extract_partnerships(listing, model: str = "gpt-4o"):
@@ -371,16 +357,10 @@ def extract_partnerships(listing, model: str = "gpt-4o"):
 You are an AI assistant. Extract any partnerships the company has.
 Return JSON: {"partnerships":"...","description":"..."}
 """
-    resp = completion(
-        model=model,
-        messages=[{"role":"system","content":"You extract partnerships from web content."},
-                  {"role":"user","content":prompt}],
-        seed=42
-    )
     try:
-        obj = json.loads(resp.choices[0].message.content)
+        obj = _json_completion(model, "You extract partnerships from web content.", prompt)
         listing.update(obj)
-    except Exception as e:
+    except UnparseableReply as e:
         print("[extract_partnerships] JSON parse error:", e)
 
 def extract_launch_date_from_article(article_text: str, model: str = "gpt-4o"):
@@ -399,14 +379,8 @@ Article:
 \"\"\"{article_text[:4000]}\"\"\"
 Return JSON: {{ "project_launch_date": "Month Year" or "TBD" }}
 """
-    resp = completion(
-        model=model,
-        messages=[{"role":"system","content":"You extract project launch dates from tech news."},
-                  {"role":"user","content":prompt}],
-        seed=42
-    )
     try:
-        return json.loads(resp.choices[0].message.content)
-    except Exception as e:
+        return _json_completion(model, "You extract project launch dates from tech news.", prompt)
+    except UnparseableReply as e:
         print("[extract_launch_date_from_article] JSON parse error:", e)
         return {"project_launch_date": "TBD"}
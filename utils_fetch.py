@@ -1,11 +1,10 @@
 # utils_fetch.py
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.sync_api import TimeoutError
+from browser_pool import pooled_page
 
 
 def fetch_html_playwright(url: str, timeout_ms: int = 30_000) -> str:
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+    with pooled_page(url) as page:
         try:
             page.goto(url, timeout=timeout_ms)
             page.wait_for_load_state("networkidle")
@@ -13,6 +12,3 @@ def fetch_html_playwright(url: str, timeout_ms: int = 30_000) -> str:
         except TimeoutError:
             print(f"[Playwright] Timeout while loading {url}")
             return ""
-        finally:
-            browser.close()
-
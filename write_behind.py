@@ -0,0 +1,222 @@
+# write_behind.py
+#
+# Write-behind buffer for scraped_data. Pipeline stages hand over row patches
+# keyed by unique_name and carry on; patches to the same row are merged, and a
+# background thread upserts them through storage.get_storage() in batches once
+# MAX_BATCH rows are pending or the oldest patch is MAX_DELAY seconds old.
+# The backend is resolved on the producer's thread when a patch is queued (the
+# Streamlit session's Supabase keys are not visible from the flusher thread), and
+# the flusher writes each row to the backend captured with it.
+# Failed batches are retried with backoff. Everything pending is flushed at
+# interpreter exit, and markdown_io overlays pending raw_data on reads so later
+# stages see their own writes.
+
+import atexit
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import run_stats
+
+MAX_BATCH   = 500     # rows per flush
+MAX_DELAY   = 2.0     # seconds a patch may wait before its batch is flushed
+MAX_RETRIES = 5       # attempts per row before it is dropped (and reported)
+MAX_BACKOFF = 30.0
+
+OnDone = Callable[[str, bool], None]
+
+
+class WriteBehindQueue:
+    def __init__(self, upsert: Optional[Callable[[List[Dict], str], Set[str]]] = None,
+                 max_batch: int = MAX_BATCH, max_delay: float = MAX_DELAY, max_retries: int = MAX_RETRIES):
+        self._upsert = upsert
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+        self._cond = threading.Condition()
+        self._pending: Dict[str, Dict] = {}          # unique_name -> merged patch
+        self._flushing: Dict[str, Dict] = {}         # patches in the batch being written
+        self._since: Dict[str, float] = {}           # unique_name -> enqueue time of its oldest unflushed patch
+        self._callbacks: Dict[str, List[OnDone]] = {}
+        self._targets: Dict[str, object] = {}         # unique_name -> backend captured at put()
+        self._attempts: Dict[str, int] = {}
+        self._in_flight = 0
+        self._retry_at = 0.0
+        self._failed_flushes = 0                     # consecutive flushes with failures (backoff)
+        self._force = False                          # flush() asked for everything now
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def _backend_upsert(self, target, rows: List[Dict], label: str) -> Set[str]:
+        if self._upsert is not None:
+            return self._upsert(rows, label)
+        return target.upsert(rows, label)
+
+    # ── producer side ──────────────────────────────────────────────────────
+    def put(self, row: Dict, on_done: Optional[OnDone] = None, backend=None):
+        """
+        Queue a patch for row["unique_name"]; on_done(unique_name, ok) runs after it is
+        flushed or dropped. backend defaults to storage.get_storage() on the calling thread.
+        """
+        name = row["unique_name"]
+        if backend is None and self._upsert is None:
+            from storage import get_storage
+            backend = get_storage()
+        with self._cond:
+            self._pending.setdefault(name, {}).update(row)
+            self._targets[name] = backend
+            self._since.setdefault(name, time.time())
+            if on_done is not None:
+                self._callbacks.setdefault(name, []).append(on_done)
+            run_stats.incr("write_behind", "patches")
+            self._ensure_thread()
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+
+    def put_many(self, rows: Iterable[Dict], on_done: Optional[OnDone] = None, backend=None):
+        if backend is None and self._upsert is None:
+            from storage import get_storage
+            backend = get_storage()
+        for row in rows:
+            self.put(row, on_done, backend)
+
+    def pending_values(self, unique_names: Iterable[str], column: str) -> Dict[str, object]:
+        """Values of column in not-yet-flushed patches, for read-your-writes."""
+        found = {}
+        with self._cond:
+            for name in unique_names:
+                for patches in (self._pending, self._flushing):
+                    if column in patches.get(name, ()):
+                        found[name] = patches[name][column]
+                        break
+        return found
+
+    def lag(self) -> float:
+        """Age in seconds of the oldest unflushed patch (0 when nothing is pending)."""
+        with self._cond:
+            return time.time() - min(self._since.values()) if self._since else 0.0
+
+    # ── flusher ────────────────────────────────────────────────────────────
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def _due(self) -> bool:
+        if not self._pending or time.time() < self._retry_at:
+            return False
+        return self._closed or self._force or len(self._pending) >= self.max_batch \
+            or time.time() - min(self._since.values()) >= self.max_delay
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._due():
+                    if self._closed and not self._pending:
+                        return
+                    self._cond.wait(timeout=min(self.max_delay, max(self._retry_at - time.time(), 0.05)))
+                names = list(self._pending)[:self.max_batch]
+                batch = {name: self._pending.pop(name) for name in names}
+                since = {name: self._since.pop(name) for name in names}
+                callbacks = {name: self._callbacks.pop(name, []) for name in names}
+                targets = {name: self._targets.pop(name, None) for name in names}
+                if not self._pending:
+                    self._force = False
+                self._flushing.update(batch)
+                self._in_flight += 1
+            try:
+                self._flush_batch(batch, since, callbacks, targets)
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+
+    def _flush_batch(self, batch: Dict[str, Dict], since: Dict[str, float], callbacks: Dict[str, List[OnDone]],
+                     targets: Dict[str, object]):
+        by_target: Dict[int, List[str]] = {}
+        for name in batch:
+            by_target.setdefault(id(targets[name]), []).append(name)
+        failed = set()
+        for names in by_target.values():
+            try:
+                failed |= self._backend_upsert(targets[names[0]], [batch[n] for n in names], "write-behind batch")
+            except Exception as e:
+                print(f"[WriteBehind] Flush of {len(names)} rows failed: {e}")
+                failed.update(names)
+
+        now = time.time()
+        run_stats.incr("write_behind", "flushes")
+        done, dropped = [], []
+        with self._cond:
+            for name, row in batch.items():
+                self._flushing.pop(name, None)
+                if name not in failed:
+                    self._attempts.pop(name, None)
+                    lag_ms = int((now - since[name]) * 1000)
+                    run_stats.incr("write_behind", "rows_flushed")
+                    run_stats.incr("write_behind", "flush_lag_ms_total", lag_ms)
+                    run_stats.maximum("write_behind", "flush_lag_ms_max", lag_ms)
+                    done.append(name)
+                    continue
+                attempts = self._attempts.get(name, 0) + 1
+                if attempts >= self.max_retries:
+                    self._attempts.pop(name, None)
+                    run_stats.incr("write_behind", "rows_dropped")
+                    dropped.append(name)
+                    continue
+                # Requeue under any newer patch for the same row, which must win
+                self._attempts[name] = attempts
+                self._pending[name] = {**row, **self._pending.get(name, {})}
+                self._since[name] = min(since[name], self._since.get(name, since[name]))
+                self._callbacks[name] = callbacks.get(name, []) + self._callbacks.get(name, [])
+                self._targets.setdefault(name, targets[name])
+                run_stats.incr("write_behind", "rows_retried")
+            self._failed_flushes = self._failed_flushes + 1 if failed else 0
+            if failed:
+                self._retry_at = now + min(2 ** self._failed_flushes, MAX_BACKOFF)
+
+        if dropped:
+            print(f"[WriteBehind] Dropping {len(dropped)} rows after {self.max_retries} failed flushes")
+        for names, ok in ((done, True), (dropped, False)):
+            for name in names:
+                for callback in callbacks.get(name, []):
+                    try:
+                        callback(name, ok)
+                    except Exception as e:
+                        print(f"[WriteBehind] Callback for {name} failed: {e}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Flush everything pending now and wait for it; returns False if timeout passed first."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            self._retry_at = 0.0
+            self._force = bool(self._pending)
+            self._ensure_thread()
+            self._cond.notify_all()
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(timeout=remaining if remaining is not None else 0.5)
+        return True
+
+    def close(self, timeout: Optional[float] = 30.0):
+        """Flush and stop the background thread (registered with atexit)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self.flush(timeout)
+
+
+_queue: Optional[WriteBehindQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_write_queue() -> WriteBehindQueue:
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = WriteBehindQueue()
+                atexit.register(_queue.close)
+    return _queue